@@ -6,6 +6,7 @@ from enum import Enum
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import json
+from pathlib import Path
 
 from src.core.simple_config import get_config
 from src.core.database import DatabaseManager, Agent, Task, AgentLog, GuardianAnalysis, ConductorAnalysis, DetectedDuplicate, SteeringIntervention
@@ -20,6 +21,20 @@ from src.monitoring.trajectory_context import TrajectoryContext
 logger = logging.getLogger(__name__)
 
 
+def _load_prompt_template(name: str) -> str:
+    """Read a prompt template from src/prompts.
+
+    Args:
+        name: Template file name without the .md extension
+
+    Returns:
+        Raw template text
+    """
+    template_path = Path(__file__).parent.parent / "prompts" / f"{name}.md"
+    with open(template_path, 'r') as f:
+        return f.read()
+
+
 class AgentState(Enum):
     """Agent state enumeration."""
     HEALTHY = "healthy"
@@ -1533,12 +1548,8 @@ class MonitoringLoop:
         Returns:
             Formatted diagnostic prompt
         """
-        from pathlib import Path
-
         # Load template
-        template_path = Path(__file__).parent.parent / "prompts" / "diagnostic_agent_analysis.md"
-        with open(template_path, 'r') as f:
-            template = f.read()
+        template = _load_prompt_template("diagnostic_agent_analysis")
 
         # Format phases info
         phases_info = []
@@ -5,6 +5,10 @@ from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 
 
+# LLM providers accepted by HephaestusConfig.validate()
+VALID_LLM_PROVIDERS = frozenset({"openai", "anthropic", "openrouter", "groq"})
+
+
 @dataclass
 class HephaestusConfig:
     """Configuration for the Hephaestus SDK.
@@ -219,10 +223,10 @@ class HephaestusConfig:
             raise ValueError("GROQ_API_KEY must be set for Groq provider")
 
         # Check provider is valid
-        valid_providers = ["openai", "anthropic", "openrouter", "groq"]
-        if self.llm_provider not in valid_providers:
+        if self.llm_provider not in VALID_LLM_PROVIDERS:
             raise ValueError(
-                f"Invalid LLM provider: {self.llm_provider}. Must be one of {valid_providers}"
+                f"Invalid LLM provider: {self.llm_provider}. "
+                f"Must be one of {sorted(VALID_LLM_PROVIDERS)}"
             )
 
         # Check port is valid
@@ -8,37 +8,104 @@ This script verifies that:
 4. All critical services and models are accessible
 """
 
+import functools
+import importlib
+import operator
 import sys
 from typing import Any
 
+import pytest
+
+
+# Names re-exported by the src.core.database compatibility shim
+OLD_DATABASE_NAMES = (
+    "Agent",
+    "Task",
+    "Memory",
+    "Workflow",
+    "WorkflowResult",
+    "AgentResult",
+    "Ticket",
+    "TicketHistory",
+    "AgentLog",
+    "GuardianAnalysis",
+    "ConductorAnalysis",
+)
+
+# (module, name) pairs for the new c1 model locations
+NEW_MODEL_TARGETS = (
+    ("src.c1_agent_models.agent", "Agent"),
+    ("src.c1_agent_models.agent", "AgentResult"),
+    ("src.c1_task_models.task", "Task"),
+    ("src.c1_memory_models.memory", "Memory"),
+    ("src.c1_workflow_models.workflow", "Workflow"),
+    ("src.c1_workflow_models.workflow", "WorkflowResult"),
+    ("src.c1_ticket_models.ticket", "Ticket"),
+)
+
+# (name, new module) pairs checked against the src.core.database shim
+MODEL_IDENTITY_TARGETS = (
+    ("Agent", "src.c1_agent_models.agent"),
+    ("Task", "src.c1_task_models.task"),
+    ("Memory", "src.c1_memory_models.memory"),
+    ("Workflow", "src.c1_workflow_models.workflow"),
+    ("WorkflowResult", "src.c1_workflow_models.workflow"),
+    ("AgentResult", "src.c1_agent_models.agent"),
+    ("Ticket", "src.c1_ticket_models.ticket"),
+)
+
+# (old module, new c2 module, class name) for migrated services
+SERVICE_TARGETS = (
+    ("src.services.ticket_service", "src.c2_ticket_service.ticket_service", "TicketService"),
+    ("src.services.queue_service", "src.c2_queue_service.queue_service", "QueueService"),
+    ("src.services.result_service", "src.c2_result_service.result_service", "ResultService"),
+    ("src.services.embedding_service", "src.c2_embedding_service.embedding_service", "EmbeddingService"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get(module_path: str, name: str) -> Any:
+    """Import ``module_path`` and return its ``name`` attribute.
+
+    Cached so repeated lookups across tests are plain dict hits. Failed
+    lookups raise and are therefore never cached.
+    """
+    return getattr(importlib.import_module(module_path), name)
+
+
+def _identity_failures(checks) -> list:
+    """Describe every (label, old_module, new_module, name) check that fails.
+
+    A check fails when the two lookups resolve to different objects or
+    when either lookup raises.
+    """
+    failures = []
+    for label, old_module, new_module, name in checks:
+        try:
+            if not operator.is_(_get(old_module, name), _get(new_module, name)):
+                failures.append(f"{label}: Old and new imports are DIFFERENT objects!")
+        except Exception as e:
+            failures.append(f"{label} identity test FAILED: {e}")
+    return failures
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _clear_import_cache():
+    """Drop cached lookups once this module's tests finish."""
+    yield
+    _get.cache_clear()
+
 
 def test_old_database_imports():
     """Old database imports should still work via shims."""
     print("\n=== Testing Old Database Imports (src.core.database) ===")
     try:
-        from src.core.database import (
-            Agent,
-            Task,
-            Memory,
-            Workflow,
-            WorkflowResult,
-            AgentResult,
-            Ticket,
-            TicketHistory,
-            AgentLog,
-            GuardianAnalysis,
-            ConductorAnalysis,
-        )
-        assert Agent is not None
-        assert Task is not None
-        assert Memory is not None
-        assert Workflow is not None
-        assert WorkflowResult is not None
-        assert AgentResult is not None
-        assert Ticket is not None
+        db_module = importlib.import_module("src.core.database")
+        for name in OLD_DATABASE_NAMES:
+            assert getattr(db_module, name) is not None
         print("✓ Old database imports work (Agent, Task, Memory, Workflow, WorkflowResult, AgentResult, Ticket, etc.)")
         return True
-    except ImportError as e:
+    except (ImportError, AttributeError) as e:
         print(f"✗ Old database imports FAILED: {e}")
         return False
 
@@ -47,21 +114,11 @@ def test_new_model_imports():
     """New c1 model imports should work."""
     print("\n=== Testing New C1 Model Imports ===")
     try:
-        from src.c1_agent_models.agent import Agent, AgentResult
-        from src.c1_task_models.task import Task
-        from src.c1_memory_models.memory import Memory
-        from src.c1_workflow_models.workflow import Workflow, WorkflowResult
-        from src.c1_ticket_models.ticket import Ticket
-        assert Agent is not None
-        assert Task is not None
-        assert Memory is not None
-        assert Workflow is not None
-        assert WorkflowResult is not None
-        assert AgentResult is not None
-        assert Ticket is not None
+        for module_path, name in NEW_MODEL_TARGETS:
+            assert _get(module_path, name) is not None
         print("✓ New c1 model imports work (Agent, Task, Memory, Workflow, WorkflowResult, AgentResult, Ticket)")
         return True
-    except ImportError as e:
+    except (ImportError, AttributeError) as e:
         print(f"✗ New c1 model imports FAILED: {e}")
         return False
 
@@ -69,99 +126,12 @@ def test_new_model_imports():
 def test_same_classes():
     """Old and new imports should point to the same classes."""
     print("\n=== Testing Import Identity ===")
-    failures = []
-
-    # Test Agent
-    try:
-        from src.core.database import Agent as OldAgent
-        from src.c1_agent_models.agent import Agent as NewAgent
-        if OldAgent is NewAgent:
-            print("✓ Agent: Old and new imports are identical")
-        else:
-            print("✗ Agent: Old and new imports are DIFFERENT objects!")
-            failures.append("Agent")
-    except Exception as e:
-        print(f"✗ Agent identity test FAILED: {e}")
-        failures.append("Agent")
-
-    # Test Task
-    try:
-        from src.core.database import Task as OldTask
-        from src.c1_task_models.task import Task as NewTask
-        if OldTask is NewTask:
-            print("✓ Task: Old and new imports are identical")
-        else:
-            print("✗ Task: Old and new imports are DIFFERENT objects!")
-            failures.append("Task")
-    except Exception as e:
-        print(f"✗ Task identity test FAILED: {e}")
-        failures.append("Task")
-
-    # Test Memory
-    try:
-        from src.core.database import Memory as OldMemory
-        from src.c1_memory_models.memory import Memory as NewMemory
-        if OldMemory is NewMemory:
-            print("✓ Memory: Old and new imports are identical")
-        else:
-            print("✗ Memory: Old and new imports are DIFFERENT objects!")
-            failures.append("Memory")
-    except Exception as e:
-        print(f"✗ Memory identity test FAILED: {e}")
-        failures.append("Memory")
-
-    # Test Workflow
-    try:
-        from src.core.database import Workflow as OldWorkflow
-        from src.c1_workflow_models.workflow import Workflow as NewWorkflow
-        if OldWorkflow is NewWorkflow:
-            print("✓ Workflow: Old and new imports are identical")
-        else:
-            print("✗ Workflow: Old and new imports are DIFFERENT objects!")
-            failures.append("Workflow")
-    except Exception as e:
-        print(f"✗ Workflow identity test FAILED: {e}")
-        failures.append("Workflow")
-
-    # Test WorkflowResult
-    try:
-        from src.core.database import WorkflowResult as OldWorkflowResult
-        from src.c1_workflow_models.workflow import WorkflowResult as NewWorkflowResult
-        if OldWorkflowResult is NewWorkflowResult:
-            print("✓ WorkflowResult: Old and new imports are identical")
-        else:
-            print("✗ WorkflowResult: Old and new imports are DIFFERENT objects!")
-            failures.append("WorkflowResult")
-    except Exception as e:
-        print(f"✗ WorkflowResult identity test FAILED: {e}")
-        failures.append("WorkflowResult")
-
-    # Test AgentResult
-    try:
-        from src.core.database import AgentResult as OldAgentResult
-        from src.c1_agent_models.agent import AgentResult as NewAgentResult
-        if OldAgentResult is NewAgentResult:
-            print("✓ AgentResult: Old and new imports are identical")
-        else:
-            print("✗ AgentResult: Old and new imports are DIFFERENT objects!")
-            failures.append("AgentResult")
-    except Exception as e:
-        print(f"✗ AgentResult identity test FAILED: {e}")
-        failures.append("AgentResult")
-
-    # Test Ticket
-    try:
-        from src.core.database import Ticket as OldTicket
-        from src.c1_ticket_models.ticket import Ticket as NewTicket
-        if OldTicket is NewTicket:
-            print("✓ Ticket: Old and new imports are identical")
-        else:
-            print("✗ Ticket: Old and new imports are DIFFERENT objects!")
-            failures.append("Ticket")
-    except Exception as e:
-        print(f"✗ Ticket identity test FAILED: {e}")
-        failures.append("Ticket")
-
+    failures = _identity_failures(
+        (name, "src.core.database", new_module, name)
+        for name, new_module in MODEL_IDENTITY_TARGETS
+    )
+    print("\n".join(f"✗ {failure}" for failure in failures)
+          or "✓ All models: Old and new imports are identical")
     return len(failures) == 0
 
 
@@ -170,26 +140,16 @@ def test_old_service_imports():
     print("\n=== Testing Old Service Imports ===")
     failures = []
 
-    # Test services that were migrated to c2 modules
-    services_to_test = [
-        ("src.services.ticket_service", "TicketService"),
-        ("src.services.queue_service", "QueueService"),
-        ("src.services.result_service", "ResultService"),
-        ("src.services.embedding_service", "EmbeddingService"),
-    ]
-
-    for module_path, class_name in services_to_test:
+    for old_module, _, class_name in SERVICE_TARGETS:
         try:
-            module = __import__(module_path, fromlist=[class_name])
-            cls = getattr(module, class_name)
-            assert cls is not None
-            print(f"✓ {module_path}.{class_name} imports successfully")
+            assert _get(old_module, class_name) is not None
+            print(f"✓ {old_module}.{class_name} imports successfully")
         except ImportError as e:
-            print(f"✗ {module_path}.{class_name} FAILED: {e}")
-            failures.append(f"{module_path}.{class_name}")
+            print(f"✗ {old_module}.{class_name} FAILED: {e}")
+            failures.append(f"{old_module}.{class_name}")
         except AttributeError as e:
-            print(f"✗ {module_path}.{class_name} FAILED (AttributeError): {e}")
-            failures.append(f"{module_path}.{class_name}")
+            print(f"✗ {old_module}.{class_name} FAILED (AttributeError): {e}")
+            failures.append(f"{old_module}.{class_name}")
 
     return len(failures) == 0
 
@@ -199,25 +159,16 @@ def test_new_service_imports():
     print("\n=== Testing New C2 Service Imports ===")
     failures = []
 
-    services_to_test = [
-        ("src.c2_ticket_service.ticket_service", "TicketService"),
-        ("src.c2_queue_service.queue_service", "QueueService"),
-        ("src.c2_result_service.result_service", "ResultService"),
-        ("src.c2_embedding_service.embedding_service", "EmbeddingService"),
-    ]
-
-    for module_path, class_name in services_to_test:
+    for _, new_module, class_name in SERVICE_TARGETS:
         try:
-            module = __import__(module_path, fromlist=[class_name])
-            cls = getattr(module, class_name)
-            assert cls is not None
-            print(f"✓ {module_path}.{class_name} imports successfully")
+            assert _get(new_module, class_name) is not None
+            print(f"✓ {new_module}.{class_name} imports successfully")
         except ImportError as e:
-            print(f"✗ {module_path}.{class_name} FAILED: {e}")
-            failures.append(f"{module_path}.{class_name}")
+            print(f"✗ {new_module}.{class_name} FAILED: {e}")
+            failures.append(f"{new_module}.{class_name}")
         except AttributeError as e:
-            print(f"✗ {module_path}.{class_name} FAILED (AttributeError): {e}")
-            failures.append(f"{module_path}.{class_name}")
+            print(f"✗ {new_module}.{class_name} FAILED (AttributeError): {e}")
+            failures.append(f"{new_module}.{class_name}")
 
     return len(failures) == 0
 
@@ -225,60 +176,12 @@ def test_new_service_imports():
 def test_service_identity():
     """Old and new service imports should point to same classes."""
     print("\n=== Testing Service Import Identity ===")
-    failures = []
-
-    # Test TicketService
-    try:
-        from src.services.ticket_service import TicketService as OldTicketService
-        from src.c2_ticket_service.ticket_service import TicketService as NewTicketService
-        if OldTicketService is NewTicketService:
-            print("✓ TicketService: Old and new imports are identical")
-        else:
-            print("✗ TicketService: Old and new imports are DIFFERENT objects!")
-            failures.append("TicketService")
-    except Exception as e:
-        print(f"✗ TicketService identity test FAILED: {e}")
-        failures.append("TicketService")
-
-    # Test QueueService
-    try:
-        from src.services.queue_service import QueueService as OldQueueService
-        from src.c2_queue_service.queue_service import QueueService as NewQueueService
-        if OldQueueService is NewQueueService:
-            print("✓ QueueService: Old and new imports are identical")
-        else:
-            print("✗ QueueService: Old and new imports are DIFFERENT objects!")
-            failures.append("QueueService")
-    except Exception as e:
-        print(f"✗ QueueService identity test FAILED: {e}")
-        failures.append("QueueService")
-
-    # Test ResultService
-    try:
-        from src.services.result_service import ResultService as OldResultService
-        from src.c2_result_service.result_service import ResultService as NewResultService
-        if OldResultService is NewResultService:
-            print("✓ ResultService: Old and new imports are identical")
-        else:
-            print("✗ ResultService: Old and new imports are DIFFERENT objects!")
-            failures.append("ResultService")
-    except Exception as e:
-        print(f"✗ ResultService identity test FAILED: {e}")
-        failures.append("ResultService")
-
-    # Test EmbeddingService
-    try:
-        from src.services.embedding_service import EmbeddingService as OldEmbeddingService
-        from src.c2_embedding_service.embedding_service import EmbeddingService as NewEmbeddingService
-        if OldEmbeddingService is NewEmbeddingService:
-            print("✓ EmbeddingService: Old and new imports are identical")
-        else:
-            print("✗ EmbeddingService: Old and new imports are DIFFERENT objects!")
-            failures.append("EmbeddingService")
-    except Exception as e:
-        print(f"✗ EmbeddingService identity test FAILED: {e}")
-        failures.append("EmbeddingService")
-
+    failures = _identity_failures(
+        (class_name, old_module, new_module, class_name)
+        for old_module, new_module, class_name in SERVICE_TARGETS
+    )
+    print("\n".join(f"✗ {failure}" for failure in failures)
+          or "✓ All services: Old and new imports are identical")
     return len(failures) == 0
 
 
@@ -286,11 +189,10 @@ def test_core_database_import():
     """Test core.database backward compatibility shim."""
     print("\n=== Testing Core Database Import ===")
     try:
-        from src.core.database import DatabaseManager
-        assert DatabaseManager is not None
+        assert _get("src.core.database", "DatabaseManager") is not None
         print("✓ src.core.database.DatabaseManager imports successfully")
         return True
-    except ImportError as e:
+    except (ImportError, AttributeError) as e:
         print(f"✗ src.core.database.DatabaseManager FAILED: {e}")
         return False
 
@@ -3,18 +3,34 @@
 This file provides test fixtures that are automatically available to all tests.
 """
 
+import importlib.util
 import pytest
+import shutil
 import tempfile
 import subprocess
 import os
 import time
 from pathlib import Path
+from types import MappingProxyType
 from unittest.mock import patch, MagicMock, Mock
-from tests.fixtures.mock_llm_provider import MockLLMProvider
 
-# Import libtmux - REQUIRED dependency for tmux fixtures
-# Will crash if not available (correct behavior)
-import libtmux
+
+# Shared provider handed to the autouse LLM patches. Built on first use
+# and reset before every test instead of being reconstructed each time.
+_MOCK_PROVIDER_SINGLETON = None
+
+
+def _get_shared_mock_provider():
+    """Return the shared MockLLMProvider, importing the mock module lazily.
+
+    Deferring the import keeps collection-only runs (``--collect-only``,
+    ``-k`` filters) from loading the mock provider module.
+    """
+    global _MOCK_PROVIDER_SINGLETON
+    if _MOCK_PROVIDER_SINGLETON is None:
+        from tests.fixtures.mock_llm_provider import MockLLMProvider
+        _MOCK_PROVIDER_SINGLETON = MockLLMProvider()
+    return _MOCK_PROVIDER_SINGLETON
 
 
 @pytest.fixture
@@ -22,7 +38,8 @@ def mock_llm_provider():
     """Provide a fresh mock LLM provider for each test.
 
     This fixture can be explicitly requested in tests that need to assert
-    on LLM provider interactions.
+    on LLM provider interactions. Unlike the shared provider used by the
+    autouse patches, this instance is private to the requesting test.
 
     Usage:
         def test_something(mock_llm_provider):
@@ -32,6 +49,8 @@ def mock_llm_provider():
     Returns:
         MockLLMProvider instance
     """
+    from tests.fixtures.mock_llm_provider import MockLLMProvider
+
     provider = MockLLMProvider()
     yield provider
     provider.reset()
@@ -55,7 +74,8 @@ def mock_llm_client_imports(monkeypatch):
     Returns:
         MockLLMProvider instance that all tests will receive
     """
-    mock_provider = MockLLMProvider()
+    mock_provider = _get_shared_mock_provider()
+    mock_provider.reset()
 
     # Patch LangChain LLM client initialization
     def mock_get_llm_client(*args, **kwargs):
@@ -98,21 +118,18 @@ def mock_llm_client_imports(monkeypatch):
     except AttributeError:
         pass
 
-    # Patch OpenAI client if imported directly
-    try:
+    # Patch OpenAI client if imported directly. find_spec only consults the
+    # import finders, so a missing package is skipped without running imports.
+    if importlib.util.find_spec("openai") is not None:
         mock_openai = Mock()
         mock_openai.return_value = mock_provider
         monkeypatch.setattr("openai.OpenAI", mock_openai)
-    except (AttributeError, ImportError):
-        pass
 
     # Patch Anthropic client if imported directly
-    try:
+    if importlib.util.find_spec("anthropic") is not None:
         mock_anthropic = Mock()
         mock_anthropic.return_value = mock_provider
         monkeypatch.setattr("anthropic.Anthropic", mock_anthropic)
-    except (AttributeError, ImportError):
-        pass
 
     return mock_provider
 
@@ -143,6 +160,15 @@ def mock_database(monkeypatch):
     return mock_db
 
 
+# Read-only so a misbehaving test cannot corrupt the values seen by later tests
+_TEST_CONFIG = MappingProxyType({
+    "database_url": "sqlite:///:memory:",
+    "llm_provider": "mock",
+    "api_key": "mock-api-key",
+    "log_level": "ERROR",  # Reduce log noise during tests
+})
+
+
 @pytest.fixture(scope="session")
 def test_config():
     """Provide test configuration values.
@@ -151,14 +177,9 @@ def test_config():
     without needing environment variables or .env files.
 
     Returns:
-        Dict of configuration values
+        Read-only mapping of configuration values
     """
-    return {
-        "database_url": "sqlite:///:memory:",
-        "llm_provider": "mock",
-        "api_key": "mock-api-key",
-        "log_level": "ERROR",  # Reduce log noise during tests
-    }
+    return _TEST_CONFIG
 
 
 @pytest.fixture
@@ -180,11 +201,23 @@ def temp_git_repo():
     with tempfile.TemporaryDirectory() as tmpdir:
         repo_path = Path(tmpdir)
 
+        # Minimal environment for the setup commands: ignore the developer's
+        # global/system git config (hooks, signing, templates) and skip
+        # optional index lock writes
+        git_env = {
+            "PATH": os.environ.get("PATH", os.defpath),
+            "HOME": tmpdir,
+            "GIT_CONFIG_GLOBAL": os.devnull,
+            "GIT_CONFIG_SYSTEM": os.devnull,
+            "GIT_OPTIONAL_LOCKS": "0",
+        }
+
         try:
             # Initialize git repo
             subprocess.run(
                 ["git", "init"],
                 cwd=repo_path,
+                env=git_env,
                 check=True,
                 capture_output=True
             )
@@ -193,12 +226,14 @@ def temp_git_repo():
             subprocess.run(
                 ["git", "config", "user.email", "test@example.com"],
                 cwd=repo_path,
+                env=git_env,
                 check=True,
                 capture_output=True
             )
             subprocess.run(
                 ["git", "config", "user.name", "Test User"],
                 cwd=repo_path,
+                env=git_env,
                 check=True,
                 capture_output=True
             )
@@ -210,12 +245,14 @@ def temp_git_repo():
             subprocess.run(
                 ["git", "add", "."],
                 cwd=repo_path,
+                env=git_env,
                 check=True,
                 capture_output=True
             )
             subprocess.run(
                 ["git", "commit", "-m", "Initial commit"],
                 cwd=repo_path,
+                env=git_env,
                 check=True,
                 capture_output=True
             )
@@ -226,6 +263,11 @@ def temp_git_repo():
             pytest.fail(f"Failed to create test git repository: {e}")
 
 
+# Names of sessions created by tmux_session that are still alive; whatever
+# remains here is killed when tmux_server tears down
+_TEST_SESSIONS = set()
+
+
 @pytest.fixture(scope="session")
 def tmux_server():
     """Provide a tmux server for agent communication testing.
@@ -236,6 +278,17 @@ def tmux_server():
     Returns:
         libtmux.Server: Tmux server instance
     """
+    # Imported here so test runs that never touch tmux skip the libtmux import.
+    # libtmux is still REQUIRED for tmux fixtures and will crash if missing.
+    import libtmux
+
+    # Under pytest-xdist give each worker its own tmux socket directory so
+    # workers talk to independent tmux daemons instead of racing on one
+    worker_tmux_dir = None
+    previous_tmux_dir = os.environ.get("TMUX_TMPDIR")
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        worker_tmux_dir = tempfile.mkdtemp(prefix=f"tmux-{os.getpid()}-")
+        os.environ["TMUX_TMPDIR"] = worker_tmux_dir
 
     try:
         # Try to get existing server
@@ -255,16 +308,26 @@ def tmux_server():
 
     yield server
 
-    # Cleanup: kill any test sessions
-    try:
-        for session in server.list_sessions():
-            if session.name and session.name.startswith("test_"):
-                try:
-                    session.kill()
-                except Exception:
-                    pass  # Session may have already been killed
-    except Exception:
-        pass  # Server may be gone, that's ok
+    # Cleanup: kill any test sessions left behind by tmux_session, by name,
+    # so tmux resolves them directly instead of listing every session
+    for session_name in _TEST_SESSIONS:
+        try:
+            server.cmd("kill-session", "-t", session_name)
+        except Exception:
+            pass  # Session may have already been killed or server is gone
+    _TEST_SESSIONS.clear()
+
+    if worker_tmux_dir is not None:
+        # The per-worker daemon belongs to this test run only
+        try:
+            server.kill_server()
+        except Exception:
+            pass
+        if previous_tmux_dir is None:
+            os.environ.pop("TMUX_TMPDIR", None)
+        else:
+            os.environ["TMUX_TMPDIR"] = previous_tmux_dir
+        shutil.rmtree(worker_tmux_dir, ignore_errors=True)
 
 
 @pytest.fixture
@@ -295,12 +358,14 @@ def tmux_session(tmux_server):
         )
     except Exception as e:
         pytest.fail(f"Failed to create tmux session: {e}")
+    _TEST_SESSIONS.add(session_name)
 
     yield session
 
     # Cleanup: kill session after test
     try:
         session.kill()
+        _TEST_SESSIONS.discard(session_name)
     except Exception:
         pass  # Session may have already been killed
 
@@ -309,22 +374,23 @@ def tmux_session(tmux_server):
 # ============================================================================
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def enable_safe_path_test_mode():
     """
-    Automatically enable SafePath TEST_MODE for all tests.
+    Automatically enable SafePath TEST_MODE for the whole test session.
 
     This restricts file I/O to data/test/ only, preventing test pollution.
-    Runs automatically for every test (autouse=True).
+    Runs automatically once per session (autouse=True, scope="session").
 
     The fixture:
-    - Enables SafePath.TEST_MODE before each test
-    - Disables SafePath.TEST_MODE after each test
+    - Enables SafePath.TEST_MODE before the first test
+    - Disables SafePath.TEST_MODE after the last test
     - Ensures tests cannot accidentally write outside data/test/
 
     Usage:
         Tests automatically get sandboxed file I/O - no action needed.
         All file operations through SafeFileIO will be restricted to data/test/
+        Tests that need unrestricted paths should request use_real_path_mode.
     """
     from src.core.safe_path import SafePath
 
@@ -333,6 +399,26 @@ def enable_safe_path_test_mode():
     SafePath.disable_test_mode()
 
 
+@pytest.fixture
+def use_real_path_mode():
+    """
+    Temporarily disable SafePath TEST_MODE for a single test.
+
+    TEST_MODE is restored after the test so the session-wide sandbox
+    stays in effect for everything else.
+
+    Usage:
+        def test_production_paths(use_real_path_mode):
+            # SafePath.TEST_MODE is False here
+            pass
+    """
+    from src.core.safe_path import SafePath
+
+    SafePath.disable_test_mode()
+    yield
+    SafePath.enable_test_mode()
+
+
 @pytest.fixture
 def test_data_dir(tmp_path):
     """
@@ -4,13 +4,89 @@ This mock provider allows tests to run without real LLM API keys by providing
 predictable fake responses for completions, chat, and embeddings.
 """
 
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 import hashlib
 
+import numpy as np
+
+
+# Embedding size (common size for sentence transformers)
+EMBEDDING_DIM = 384
+
+# Per-lane constants for the vectorized embedding kernel: lane i uses the
+# 64-bit text seed shifted right by (i % 64)
+_LANE_INDEX = np.arange(EMBEDDING_DIM, dtype=np.uint64)
+_LANE_SHIFT = _LANE_INDEX % np.uint64(64)
+
+# Constant parts of the OpenAI-compatible response payloads. Each call copies
+# these and fills in the per-call fields; nested dicts are built per response
+# so no two responses share mutable state.
+_COMPLETION_TEMPLATE = {"object": "text_completion", "created": 1234567890}
+_COMPLETION_CHOICE_TEMPLATE = {"index": 0, "logprobs": None, "finish_reason": "stop"}
+_CHAT_TEMPLATE = {"object": "chat.completion", "created": 1234567890}
+_CHAT_CHOICE_TEMPLATE = {"index": 0, "finish_reason": "stop"}
+_EMBEDDING_TEMPLATE = {"object": "list"}
+_EMBEDDING_ITEM_TEMPLATE = {"object": "embedding", "index": 0}
+
+
+@dataclass(slots=True)
+class _EmbeddingItem:
+    """Single embedding entry of an OpenAI-style embeddings response."""
+
+    embedding: List[float]
+    index: int
+
+
+@dataclass(slots=True)
+class _EmbeddingUsage:
+    """Token usage of an OpenAI-style embeddings response."""
+
+    prompt_tokens: int
+    total_tokens: int
+
+
+@dataclass(slots=True)
+class _EmbeddingResponse:
+    """OpenAI-style embeddings response with attribute access."""
+
+    data: List[_EmbeddingItem]
+    model: str
+    usage: _EmbeddingUsage
+
+
+@lru_cache(maxsize=4096)
+def _mock_embedding_vector(text: str) -> Tuple[float, ...]:
+    """Compute the deterministic fake embedding for ``text``.
+
+    The vector is derived from a 64-bit seed of the text. blake2b is stable
+    across processes (unlike hash()), so xdist workers and separate runs
+    agree on every embedding.
+
+    Args:
+        text: Input text to embed
+
+    Returns:
+        Immutable 384-dimensional vector with values in [-1, 1]
+    """
+    seed = np.uint64(int.from_bytes(
+        hashlib.blake2b(text.encode(), digest_size=8).digest(), "big"
+    ))
+
+    # Generate all lanes in one vectorized pass; lane i is
+    # ((seed >> (i % 64)) + i) % 200 - 100
+    modulus = np.uint64(200)
+    shifted = (seed >> _LANE_SHIFT) % modulus
+    vals = ((shifted + _LANE_INDEX) % modulus).astype(np.int64) - 100
+    return tuple((vals / 100.0).tolist())  # Normalize to [-1, 1] range
+
 
 class MockEmbeddings:
     """Mock embeddings API that mimics OpenAI client.embeddings interface."""
 
+    __slots__ = ("parent",)
+
     def __init__(self, parent):
         """Initialize mock embeddings API.
 
@@ -39,18 +115,14 @@ class MockEmbeddings:
         """
         # Use parent's generate_embedding method
         response_dict = self.parent.generate_embedding(input, model, **kwargs)
+        item = response_dict['data'][0]
 
-        # Create mock response object that can be accessed with dot notation
-        class MockResponse:
-            def __init__(self, response_dict):
-                self.data = [type('obj', (object,), {
-                    'embedding': response_dict['data'][0]['embedding'],
-                    'index': response_dict['data'][0]['index']
-                })]
-                self.model = response_dict['model']
-                self.usage = type('obj', (object,), response_dict['usage'])
-
-        return MockResponse(response_dict)
+        # Wrap in objects that can be accessed with dot notation
+        return _EmbeddingResponse(
+            data=[_EmbeddingItem(embedding=item['embedding'], index=item['index'])],
+            model=response_dict['model'],
+            usage=_EmbeddingUsage(**response_dict['usage']),
+        )
 
 
 class MockLLMProvider:
@@ -68,16 +140,25 @@ class MockLLMProvider:
         assert "Mock response" in response["choices"][0]["text"]
     """
 
-    def __init__(self, provider_name: str = "mock"):
+    __slots__ = (
+        "provider_name", "call_count", "last_request", "responses", "embeddings",
+        "_record_history",
+    )
+
+    def __init__(self, provider_name: str = "mock", record_history: bool = False):
         """Initialize mock LLM provider.
 
         Args:
             provider_name: Name to identify this mock provider
+            record_history: Keep every response in ``responses``. Off by
+                default so long test runs don't retain every payload.
         """
         self.provider_name = provider_name
         self.call_count = 0
         self.last_request = None
-        self.responses = []  # History of all responses
+        self._record_history = record_history
+        # History of all responses (None unless record_history is enabled)
+        self.responses = [] if record_history else None
         self.embeddings = MockEmbeddings(self)  # OpenAI-compatible embeddings API
 
     def generate_completion(
@@ -109,25 +190,22 @@ class MockLLMProvider:
             "max_tokens": max_tokens,
         }
 
-        response = {
-            "id": f"mock-completion-{self.call_count}",
-            "object": "text_completion",
-            "created": 1234567890,
-            "model": model,
-            "choices": [{
-                "text": f"Mock response to: {prompt[:50]}...",
-                "index": 0,
-                "logprobs": None,
-                "finish_reason": "stop",
-            }],
-            "usage": {
-                "prompt_tokens": len(prompt.split()),
-                "completion_tokens": 10,
-                "total_tokens": len(prompt.split()) + 10,
-            },
+        response = _COMPLETION_TEMPLATE.copy()
+        response["id"] = f"mock-completion-{self.call_count}"
+        response["model"] = model
+        response["choices"] = [{
+            **_COMPLETION_CHOICE_TEMPLATE,
+            "text": f"Mock response to: {prompt[:50]}...",
+        }]
+        prompt_tokens = len(prompt.split())
+        response["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 10,
+            "total_tokens": prompt_tokens + 10,
         }
 
-        self.responses.append(response)
+        if self._record_history:
+            self.responses.append(response)
         return response
 
     def generate_chat_completion(
@@ -161,27 +239,25 @@ class MockLLMProvider:
 
         last_message = messages[-1]["content"] if messages else ""
 
-        response = {
-            "id": f"mock-chat-{self.call_count}",
-            "object": "chat.completion",
-            "created": 1234567890,
-            "model": model,
-            "choices": [{
-                "index": 0,
-                "message": {
-                    "role": "assistant",
-                    "content": f"Mock response to: {last_message[:50]}...",
-                },
-                "finish_reason": "stop",
-            }],
-            "usage": {
-                "prompt_tokens": sum(len(m["content"].split()) for m in messages),
-                "completion_tokens": 10,
-                "total_tokens": sum(len(m["content"].split()) for m in messages) + 10,
+        response = _CHAT_TEMPLATE.copy()
+        response["id"] = f"mock-chat-{self.call_count}"
+        response["model"] = model
+        response["choices"] = [{
+            **_CHAT_CHOICE_TEMPLATE,
+            "message": {
+                "role": "assistant",
+                "content": f"Mock response to: {last_message[:50]}...",
             },
+        }]
+        prompt_tokens = sum(len(m["content"].split()) for m in messages)
+        response["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 10,
+            "total_tokens": prompt_tokens + 10,
         }
 
-        self.responses.append(response)
+        if self._record_history:
+            self.responses.append(response)
         return response
 
     def generate_embedding(
@@ -211,39 +287,34 @@ class MockLLMProvider:
             "model": model,
         }
 
-        # Create deterministic fake embedding from text hash
-        # This ensures same text always gets same embedding
-        hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
-
-        # Generate 384-dimensional embedding (common size for sentence transformers)
-        fake_embedding = []
-        for i in range(384):
-            # Use hash to generate pseudo-random but deterministic values
-            val = ((hash_val >> (i % 128)) + i) % 200 - 100
-            fake_embedding.append(val / 100.0)  # Normalize to [-1, 1] range
-
-        response = {
-            "object": "list",
-            "data": [{
-                "object": "embedding",
-                "embedding": fake_embedding,
-                "index": 0,
-            }],
-            "model": model,
-            "usage": {
-                "prompt_tokens": len(text.split()),
-                "total_tokens": len(text.split()),
-            },
+        # Same text always maps to the same (cached) vector; copy it so callers
+        # that mutate the embedding cannot corrupt the cache
+        fake_embedding = list(_mock_embedding_vector(text))
+
+        response = _EMBEDDING_TEMPLATE.copy()
+        response["data"] = [{**_EMBEDDING_ITEM_TEMPLATE, "embedding": fake_embedding}]
+        response["model"] = model
+        prompt_tokens = len(text.split())
+        response["usage"] = {
+            "prompt_tokens": prompt_tokens,
+            "total_tokens": prompt_tokens,
         }
 
-        self.responses.append(response)
+        if self._record_history:
+            self.responses.append(response)
         return response
 
     def reset(self):
         """Reset mock state (call count, last request, response history)."""
         self.call_count = 0
         self.last_request = None
-        self.responses = []
+        if self.responses is not None:
+            self.responses = []
+
+    @staticmethod
+    def reset_cache():
+        """Clear the shared embedding cache so vectors are recomputed."""
+        _mock_embedding_vector.cache_clear()
 
     def __repr__(self):
         """String representation of mock provider."""
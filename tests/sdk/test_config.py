@@ -6,10 +6,18 @@ import os
 from src.sdk.config import HephaestusConfig
 
 
-def test_config_defaults():
+@pytest.fixture(autouse=True)
+def clear_api_keys(monkeypatch):
+    """Remove any *_API_KEY variables so each test starts from a clean env."""
+    for key in list(os.environ):
+        if key.endswith("_API_KEY"):
+            monkeypatch.delenv(key)
+
+
+def test_config_defaults(monkeypatch):
     """Test default configuration values."""
     # Set env vars for API keys
-    os.environ["ANTHROPIC_API_KEY"] = "test-key"
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
 
     config = HephaestusConfig()
 
@@ -19,13 +27,10 @@ def test_config_defaults():
     assert config.mcp_port == 8000
     assert config.monitoring_interval == 60
 
-    # Cleanup
-    del os.environ["ANTHROPIC_API_KEY"]
-
 
-def test_config_custom_values():
+def test_config_custom_values(monkeypatch):
     """Test custom configuration values."""
-    os.environ["OPENAI_API_KEY"] = "test-key"
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
 
     config = HephaestusConfig(
         database_path="/custom/path/db.sqlite",
@@ -41,40 +46,32 @@ def test_config_custom_values():
     assert config.llm_model == "gpt-4"
     assert config.mcp_port == 9000
 
-    del os.environ["OPENAI_API_KEY"]
 
-
-def test_config_validation_missing_api_key():
-    """Test that validation fails when API key is missing."""
-    config = HephaestusConfig(llm_provider="openai")
-
-    with pytest.raises(ValueError, match="OPENAI_API_KEY must be set"):
+@pytest.mark.parametrize(
+    "env, kwargs, match",
+    [
+        pytest.param({}, {"llm_provider": "openai"},
+                     "OPENAI_API_KEY must be set", id="missing_api_key"),
+        pytest.param({}, {"llm_provider": "invalid_provider"},
+                     "Invalid LLM provider", id="invalid_provider"),
+        pytest.param({"ANTHROPIC_API_KEY": "test-key"}, {"mcp_port": 80},  # Port too low
+                     "Invalid MCP port", id="invalid_port"),
+    ],
+)
+def test_config_validation_errors(monkeypatch, env, kwargs, match):
+    """Test that validation rejects missing keys, bad providers and bad ports."""
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+
+    config = HephaestusConfig(**kwargs)
+
+    with pytest.raises(ValueError, match=match):
         config.validate()
 
 
-def test_config_validation_invalid_provider():
-    """Test that validation fails for invalid provider."""
-    config = HephaestusConfig(llm_provider="invalid_provider")
-
-    with pytest.raises(ValueError, match="Invalid LLM provider"):
-        config.validate()
-
-
-def test_config_validation_invalid_port():
-    """Test that validation fails for invalid port."""
-    os.environ["ANTHROPIC_API_KEY"] = "test-key"
-
-    config = HephaestusConfig(mcp_port=80)  # Port too low
-
-    with pytest.raises(ValueError, match="Invalid MCP port"):
-        config.validate()
-
-    del os.environ["ANTHROPIC_API_KEY"]
-
-
-def test_config_to_env_dict():
+def test_config_to_env_dict(monkeypatch):
     """Test converting config to environment dict."""
-    os.environ["ANTHROPIC_API_KEY"] = "test-anthropic-key"
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-anthropic-key")
 
     config = HephaestusConfig(
         llm_provider="anthropic",
@@ -90,23 +87,18 @@ def test_config_to_env_dict():
     assert env_dict["ANTHROPIC_API_KEY"] == "test-anthropic-key"
     assert "MCP_PORT" in env_dict
 
-    del os.environ["ANTHROPIC_API_KEY"]
-
 
-def test_config_auto_sets_model():
+@pytest.mark.parametrize(
+    "provider, env_key, expected_model",
+    [
+        ("openai", "OPENAI_API_KEY", "gpt-5"),
+        ("anthropic", "ANTHROPIC_API_KEY", "claude-sonnet-4-5-20250929"),
+    ],
+)
+def test_config_auto_sets_model(monkeypatch, provider, env_key, expected_model):
     """Test that default model is set based on provider."""
-    os.environ["OPENAI_API_KEY"] = "test-key"
-
-    config = HephaestusConfig(llm_provider="openai")
-
-    assert config.llm_model == "gpt-5"
-
-    del os.environ["OPENAI_API_KEY"]
-
-    os.environ["ANTHROPIC_API_KEY"] = "test-key"
-
-    config = HephaestusConfig(llm_provider="anthropic")
+    monkeypatch.setenv(env_key, "test-key")
 
-    assert config.llm_model == "claude-sonnet-4-5-20250929"
+    config = HephaestusConfig(llm_provider=provider)
 
-    del os.environ["ANTHROPIC_API_KEY"]
+    assert config.llm_model == expected_model
@@ -1,173 +1,285 @@
-"""Tests for agent output capture on termination."""
+"""Tests for agent output capture on termination.
+
+Every test gets its own agent ID and freshly reset mocks, so the module is
+safe to run in parallel with pytest-xdist:
+
+    pytest -n auto --dist=loadgroup tests/test_agent_output_capture.py
+"""
 
 import asyncio
-import uuid
+import copy
+import itertools
+import os
 from datetime import datetime
-from unittest.mock import MagicMock, Mock, patch, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
 import pytest
+from sqlalchemy.orm import configure_mappers
 
 from src.agents.manager import AgentManager
-from src.core.database import DatabaseManager, Agent, AgentLog, Task
+from src.core.database import Agent, AgentLog, Task
+
+
+# Spec'd prototypes built once; _mock_row() shallow-copies them so each test
+# gets an isinstance-compatible row without re-introspecting the ORM class
+_AGENT_SPEC = Mock(spec=Agent)
+_LOG_SPEC = Mock(spec=AgentLog)
+
+
+# Pane output shared by the capture tests, plus the joined string they expect
+_TEST_OUTPUT_LINES = (
+    "Line 1: Starting task",
+    "Line 2: Processing...",
+    "Line 3: Task completed successfully",
+)
+_TEST_OUTPUT = "\n".join(_TEST_OUTPUT_LINES)
+
+# capture-pane arguments expected from terminate_agent and from
+# get_agent_output(lines=200); compared directly against call_args.args
+_TERMINATE_CAPTURE_ARGS = ("capture-pane", "-p", "-S", "-10000")
+_LIVE_CAPTURE_ARGS = ("capture-pane", "-p", "-S -200")
+
+# Stored output for the line-limit test and its last five lines
+_TEN_LINES = "\n".join(f"Line {i}" for i in range(1, 11))
+_LAST_FIVE_LINES = "\n".join(f"Line {i}" for i in range(6, 11))
+
+
+class _RaisingPane:
+    """Pane stub whose capture always fails (no call recording needed)."""
+
+    def cmd(self, *args):
+        raise Exception("Failed to capture pane")
+
+
+# Agent IDs only need to be unique within this process's mocks, so a counter
+# (tagged with the PID for xdist) stands in for uuid4
+_ID_COUNTER = itertools.count()
+
+
+def _fake_id():
+    """Return a unique, UUID-free agent ID for mock-only tests."""
+    return f"agent-{next(_ID_COUNTER):08x}-{os.getpid()}"
+
+
+async def _generate_agent_prompt(*args, **kwargs):
+    """Coroutine stub for the LLM provider; no test asserts on its calls."""
+    return "Test prompt"
+
+
+class _FakeQuery:
+    """Query stub: filter/order calls chain, first() returns a fixed row."""
+
+    def __init__(self, first_result):
+        self._result = first_result
+
+    def filter_by(self, **kwargs):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def first(self):
+        return self._result
+
+
+class _FakeSession:
+    """Session stub that answers successive query() calls from ``results``."""
+
+    def __init__(self, results):
+        self._results = iter(results)
+
+    def query(self, model):
+        return _FakeQuery(next(self._results))
+
+    def close(self):
+        pass
+
+
+def _mock_row(prototype, **attrs):
+    """Copy a spec'd prototype and set plain attribute values on the copy.
+
+    Copies share child mocks with the prototype, so only assign concrete
+    values here rather than configuring auto-created child mocks.
+    """
+    row = copy.copy(prototype)
+    for name, value in attrs.items():
+        setattr(row, name, value)
+    return row
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_orm():
+    """Configure the SQLAlchemy mappers once, before the first test.
+
+    The first AgentLog() built by terminate_agent would otherwise pay for
+    mapper configuration inside whichever test happens to run first (on
+    every xdist worker). libtmux and unittest.mock are already imported at
+    module load via AgentManager and the spec prototypes above.
+    """
+    configure_mappers()
 
 
 class TestAgentOutputCapture:
     """Test suite for agent output capture functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_db_manager(self):
-        """Create a mock database manager."""
-        db_manager = Mock(spec=DatabaseManager)
+        """Create a mock database manager (shared by the module, reset per test)."""
+        db_manager = Mock()
         return db_manager
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_llm_provider(self):
-        """Create a mock LLM provider."""
+        """Create a mock LLM provider (shared by the module, reset per test)."""
         llm_provider = Mock()
-        llm_provider.generate_agent_prompt = AsyncMock(return_value="Test prompt")
+        llm_provider.generate_agent_prompt = _generate_agent_prompt
         return llm_provider
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_tmux_server(self):
-        """Create a mock tmux server."""
+        """Create a mock tmux server (shared by the module, reset per test)."""
         server = Mock()
         return server
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def agent_manager(self, mock_db_manager, mock_llm_provider, mock_tmux_server):
-        """Create an agent manager with mocked dependencies."""
-        # Patch the actual module location after refactoring
-        with patch('src.c2_agent_service.agent_manager.libtmux.Server', return_value=mock_tmux_server):
-            manager = AgentManager(mock_db_manager, mock_llm_provider)
-            manager.tmux_server = mock_tmux_server
-            return manager
-
-    @pytest.mark.asyncio
-    async def test_terminate_agent_captures_output(self, agent_manager, mock_db_manager, mock_tmux_server):
-        """Test that terminate_agent captures output before killing the session."""
-        # Setup
-        agent_id = str(uuid.uuid4())
-        session_name = f"test_session_{agent_id[:8]}"
-        test_output_lines = [
-            "Line 1: Starting task",
-            "Line 2: Processing...",
-            "Line 3: Task completed successfully"
-        ]
-
-        # Create mock agent
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.tmux_session_name = session_name
-        mock_agent.status = "working"
+        """Create an agent manager with mocked dependencies, once per module.
+
+        __init__ is bypassed (it builds a real tmux server, config and
+        worktree manager); only the attributes terminate_agent and
+        get_agent_output use are set.
+        """
+        manager = AgentManager.__new__(AgentManager)
+        manager.db_manager = mock_db_manager
+        manager.llm_provider = mock_llm_provider
+        manager.tmux_server = mock_tmux_server
+        return manager
+
+    @pytest.fixture(autouse=True)
+    def _reset_mocks(self, mock_db_manager, mock_llm_provider, mock_tmux_server, agent_manager):
+        """Clear state the shared mocks picked up in earlier tests."""
+        for shared_mock in (mock_db_manager, mock_llm_provider, mock_tmux_server):
+            shared_mock.reset_mock(return_value=True, side_effect=True)
 
-        # Create mock tmux session
-        mock_tmux_session = Mock()
-        mock_pane = Mock()
-        mock_pane.cmd.return_value = Mock(stdout=test_output_lines)
-        mock_tmux_session.attached_window.attached_pane = mock_pane
+    @pytest.fixture
+    def agent_scenario(self, request, mock_db_manager, mock_tmux_server):
+        """Wire a working agent and its tmux session into the shared mocks.
+
+        ``request.param`` picks the tmux state:
+        - "live": the session exists and its pane returns _TEST_OUTPUT_LINES
+        - "no_session": tmux reports no session for the agent
+        - "capture_fail": the session exists but capture-pane raises
+        """
+        mode = request.param
+        agent_id = _fake_id()
+        session_name = f"test_session_{agent_id}"
+
+        mock_agent = _mock_row(
+            _AGENT_SPEC,
+            id=agent_id,
+            tmux_session_name=session_name,
+            status="working",
+        )
 
         # Setup database session mock
         mock_db_session = Mock()
         mock_db_session.query.return_value.filter_by.return_value.first.return_value = mock_agent
-        mock_db_session.add = Mock()
-        mock_db_session.commit = Mock()
         mock_db_manager.get_session.return_value = mock_db_session
 
-        # Setup tmux server mock
-        mock_tmux_server.has_session.return_value = True
-        mock_tmux_server.sessions = [mock_tmux_session]
+        # Setup tmux session and server mocks
+        mock_tmux_session = Mock()
         mock_tmux_session.name = session_name
+        if mode == "capture_fail":
+            mock_pane = _RaisingPane()
+        else:
+            mock_pane = Mock()
+            mock_pane.cmd.return_value = Mock(stdout=list(_TEST_OUTPUT_LINES))
+        mock_tmux_session.attached_window.attached_pane = mock_pane
+        mock_tmux_server.has_session.return_value = mode != "no_session"
+        mock_tmux_server.sessions = [mock_tmux_session]
+
+        return SimpleNamespace(
+            agent_id=agent_id,
+            agent=mock_agent,
+            db_session=mock_db_session,
+            tmux_session=mock_tmux_session,
+            pane=mock_pane,
+        )
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "agent_scenario, expected_output, expected_lines, session_killed",
+        [
+            ("live", _TEST_OUTPUT, len(_TEST_OUTPUT_LINES), True),
+            ("no_session", "", 0, False),
+            ("capture_fail", "", 0, True),
+        ],
+        indirect=["agent_scenario"],
+        ids=["live", "no_session", "capture_fail"],
+    )
+    async def test_terminate_agent_records_final_output(
+        self, agent_manager, agent_scenario, expected_output, expected_lines, session_killed
+    ):
+        """Test that terminate_agent captures output (when it can) before killing the session."""
         # Execute
-        await agent_manager.terminate_agent(agent_id)
+        await agent_manager.terminate_agent(agent_scenario.agent_id)
 
-        # Verify output was captured
-        mock_pane.cmd.assert_called_with("capture-pane", "-p", "-S", "-10000")
+        # Verify output was captured from the live pane
+        if expected_output:
+            assert agent_scenario.pane.cmd.call_args.args == _TERMINATE_CAPTURE_ARGS
 
-        # Verify agent status was updated
-        assert mock_agent.status == "terminated"
+        # Verify agent status was updated even when capture was impossible
+        assert agent_scenario.agent.status == "terminated"
 
-        # Verify AgentLog was created with output
-        mock_db_session.add.assert_called_once()
-        log_entry = mock_db_session.add.call_args[0][0]
+        # Verify AgentLog was created with the captured (or empty) output
+        agent_scenario.db_session.add.assert_called_once()
+        log_entry = agent_scenario.db_session.add.call_args[0][0]
         assert isinstance(log_entry, AgentLog)
-        assert log_entry.agent_id == agent_id
+        assert log_entry.agent_id == agent_scenario.agent_id
         assert log_entry.log_type == "terminated"
-        assert log_entry.details["final_output"] == "\n".join(test_output_lines)
-        assert log_entry.details["output_lines"] == len(test_output_lines)
+        assert log_entry.details["final_output"] == expected_output
+        assert log_entry.details["output_lines"] == expected_lines
 
-        # Verify session was killed after capturing output
-        mock_tmux_session.kill_session.assert_called_once()
+        # Verify the session was killed only if it existed
+        assert agent_scenario.tmux_session.kill_session.called == session_killed
 
         # Verify database commit
-        mock_db_session.commit.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_terminate_agent_handles_no_session(self, agent_manager, mock_db_manager, mock_tmux_server):
-        """Test that terminate_agent handles missing tmux session gracefully."""
-        # Setup
-        agent_id = str(uuid.uuid4())
-        session_name = f"test_session_{agent_id[:8]}"
-
-        # Create mock agent
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.tmux_session_name = session_name
-        mock_agent.status = "working"
-
-        # Setup database session mock
-        mock_db_session = Mock()
-        mock_db_session.query.return_value.filter_by.return_value.first.return_value = mock_agent
-        mock_db_session.add = Mock()
-        mock_db_session.commit = Mock()
-        mock_db_manager.get_session.return_value = mock_db_session
-
-        # Setup tmux server mock - no session exists
-        mock_tmux_server.has_session.return_value = False
+        agent_scenario.db_session.commit.assert_called_once()
 
+    @pytest.mark.parametrize("agent_scenario", ["live"], indirect=True)
+    def test_get_agent_output_from_tmux_for_active_agent(self, agent_manager, agent_scenario):
+        """Test that get_agent_output retrieves from tmux for active agents."""
         # Execute
-        await agent_manager.terminate_agent(agent_id)
+        output = agent_manager.get_agent_output(agent_scenario.agent_id, lines=200)
 
-        # Verify agent status was still updated
-        assert mock_agent.status == "terminated"
-
-        # Verify AgentLog was created with empty output
-        mock_db_session.add.assert_called_once()
-        log_entry = mock_db_session.add.call_args[0][0]
-        assert isinstance(log_entry, AgentLog)
-        assert log_entry.agent_id == agent_id
-        assert log_entry.log_type == "terminated"
-        assert log_entry.details["final_output"] == ""
-        assert log_entry.details["output_lines"] == 0
+        # Verify tmux was called
+        assert agent_scenario.pane.cmd.call_args.args == _LIVE_CAPTURE_ARGS
 
-        # Verify database commit
-        mock_db_session.commit.assert_called_once()
+        # Verify output
+        assert output == _TEST_OUTPUT
 
     def test_get_agent_output_retrieves_from_log_for_terminated(self, agent_manager, mock_db_manager):
         """Test that get_agent_output retrieves from AgentLog for terminated agents."""
         # Setup
-        agent_id = str(uuid.uuid4())
+        agent_id = _fake_id()
         stored_output = "This is the stored final output\nLine 2\nLine 3"
 
         # Create mock agent
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.status = "terminated"
+        mock_agent = _mock_row(
+            _AGENT_SPEC,
+            id=agent_id,
+            status="terminated",
+        )
 
         # Create mock AgentLog with stored output
-        mock_log = Mock(spec=AgentLog)
-        mock_log.details = {
+        mock_log = _mock_row(_LOG_SPEC, details={
             "final_output": stored_output,
             "output_lines": 3,
             "captured_at": datetime.utcnow().isoformat()
-        }
+        })
 
-        # Setup database session mock
-        mock_db_session = Mock()
-        mock_db_session.query.return_value.filter_by.side_effect = [
-            Mock(first=Mock(return_value=mock_agent)),  # First call for Agent
-            Mock(order_by=Mock(return_value=Mock(first=Mock(return_value=mock_log))))  # Second call for AgentLog
-        ]
-        mock_db_manager.get_session.return_value = mock_db_session
+        # Setup database session: first query loads the Agent, second the AgentLog
+        mock_db_manager.get_session.return_value = _FakeSession([mock_agent, mock_log])
 
         # Execute
         output = agent_manager.get_agent_output(agent_id)
@@ -178,92 +290,45 @@ class TestAgentOutputCapture:
     def test_get_agent_output_retrieves_last_n_lines_for_terminated(self, agent_manager, mock_db_manager):
         """Test that get_agent_output respects lines parameter for terminated agents."""
         # Setup
-        agent_id = str(uuid.uuid4())
-        stored_output = "\n".join([f"Line {i}" for i in range(1, 11)])  # 10 lines
+        agent_id = _fake_id()
 
         # Create mock agent
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.status = "terminated"
+        mock_agent = _mock_row(
+            _AGENT_SPEC,
+            id=agent_id,
+            status="terminated",
+        )
 
         # Create mock AgentLog with stored output
-        mock_log = Mock(spec=AgentLog)
-        mock_log.details = {
-            "final_output": stored_output,
+        mock_log = _mock_row(_LOG_SPEC, details={
+            "final_output": _TEN_LINES,
             "output_lines": 10,
             "captured_at": datetime.utcnow().isoformat()
-        }
+        })
 
-        # Setup database session mock
-        mock_db_session = Mock()
-        mock_db_session.query.return_value.filter_by.side_effect = [
-            Mock(first=Mock(return_value=mock_agent)),  # First call for Agent
-            Mock(order_by=Mock(return_value=Mock(first=Mock(return_value=mock_log))))  # Second call for AgentLog
-        ]
-        mock_db_manager.get_session.return_value = mock_db_session
+        # Setup database session: first query loads the Agent, second the AgentLog
+        mock_db_manager.get_session.return_value = _FakeSession([mock_agent, mock_log])
 
         # Execute - request only last 5 lines
         output = agent_manager.get_agent_output(agent_id, lines=5)
 
         # Verify - should get last 5 lines
-        expected_lines = ["Line 6", "Line 7", "Line 8", "Line 9", "Line 10"]
-        assert output == "\n".join(expected_lines)
-
-    def test_get_agent_output_from_tmux_for_active_agent(self, agent_manager, mock_db_manager, mock_tmux_server):
-        """Test that get_agent_output retrieves from tmux for active agents."""
-        # Setup
-        agent_id = str(uuid.uuid4())
-        session_name = f"test_session_{agent_id[:8]}"
-        test_output_lines = ["Active output line 1", "Active output line 2"]
-
-        # Create mock agent (not terminated)
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.status = "working"
-        mock_agent.tmux_session_name = session_name
-
-        # Create mock tmux session
-        mock_tmux_session = Mock()
-        mock_pane = Mock()
-        mock_pane.cmd.return_value = Mock(stdout=test_output_lines)
-        mock_tmux_session.attached_window.attached_pane = mock_pane
-        mock_tmux_session.name = session_name
-
-        # Setup database session mock
-        mock_db_session = Mock()
-        mock_db_session.query.return_value.filter_by.return_value.first.return_value = mock_agent
-        mock_db_manager.get_session.return_value = mock_db_session
-
-        # Setup tmux server mock
-        mock_tmux_server.has_session.return_value = True
-        mock_tmux_server.sessions = [mock_tmux_session]
-
-        # Execute
-        output = agent_manager.get_agent_output(agent_id, lines=200)
-
-        # Verify tmux was called
-        mock_pane.cmd.assert_called_with("capture-pane", "-p", "-S -200")
-
-        # Verify output
-        assert output == "\n".join(test_output_lines)
+        assert output == _LAST_FIVE_LINES
 
     def test_get_agent_output_handles_no_stored_output(self, agent_manager, mock_db_manager):
         """Test that get_agent_output handles terminated agents with no stored output."""
         # Setup
-        agent_id = str(uuid.uuid4())
+        agent_id = _fake_id()
 
         # Create mock agent
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.status = "terminated"
+        mock_agent = _mock_row(
+            _AGENT_SPEC,
+            id=agent_id,
+            status="terminated",
+        )
 
-        # No AgentLog found
-        mock_db_session = Mock()
-        mock_db_session.query.return_value.filter_by.side_effect = [
-            Mock(first=Mock(return_value=mock_agent)),  # First call for Agent
-            Mock(order_by=Mock(return_value=Mock(first=Mock(return_value=None))))  # Second call for AgentLog
-        ]
-        mock_db_manager.get_session.return_value = mock_db_session
+        # First query loads the Agent; no AgentLog found
+        mock_db_manager.get_session.return_value = _FakeSession([mock_agent, None])
 
         # Execute
         output = agent_manager.get_agent_output(agent_id)
@@ -271,55 +336,6 @@ class TestAgentOutputCapture:
         # Verify
         assert output == "Agent terminated - no output was captured"
 
-    @pytest.mark.asyncio
-    async def test_terminate_agent_handles_output_capture_failure(self, agent_manager, mock_db_manager, mock_tmux_server):
-        """Test that terminate_agent handles output capture failure gracefully."""
-        # Setup
-        agent_id = str(uuid.uuid4())
-        session_name = f"test_session_{agent_id[:8]}"
-
-        # Create mock agent
-        mock_agent = Mock(spec=Agent)
-        mock_agent.id = agent_id
-        mock_agent.tmux_session_name = session_name
-        mock_agent.status = "working"
-
-        # Create mock tmux session that fails to capture
-        mock_tmux_session = Mock()
-        mock_pane = Mock()
-        mock_pane.cmd.side_effect = Exception("Failed to capture pane")
-        mock_tmux_session.attached_window.attached_pane = mock_pane
-        mock_tmux_session.name = session_name
-
-        # Setup database session mock
-        mock_db_session = Mock()
-        mock_db_session.query.return_value.filter_by.return_value.first.return_value = mock_agent
-        mock_db_session.add = Mock()
-        mock_db_session.commit = Mock()
-        mock_db_manager.get_session.return_value = mock_db_session
-
-        # Setup tmux server mock
-        mock_tmux_server.has_session.return_value = True
-        mock_tmux_server.sessions = [mock_tmux_session]
-
-        # Execute
-        await agent_manager.terminate_agent(agent_id)
-
-        # Verify agent was still terminated despite capture failure
-        assert mock_agent.status == "terminated"
-
-        # Verify AgentLog was created with empty output
-        mock_db_session.add.assert_called_once()
-        log_entry = mock_db_session.add.call_args[0][0]
-        assert log_entry.details["final_output"] == ""
-        assert log_entry.details["output_lines"] == 0
-
-        # Verify session was still killed
-        mock_tmux_session.kill_session.assert_called_once()
-
-        # Verify database commit
-        mock_db_session.commit.assert_called_once()
-
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
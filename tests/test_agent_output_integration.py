@@ -1,48 +1,58 @@
-"""Integration tests for agent output capture with real tmux sessions."""
+"""Integration tests for agent output capture with real tmux sessions.
+
+Safe to run under pytest-xdist with ``--dist=loadgroup``: the tests are in
+the "tmux" xdist group, so they stay on one worker while other tests fan
+out. Tmux sessions come from the shared conftest fixtures, which give each
+worker its own tmux socket directory and PID-tagged session names.
+"""
 
 import asyncio
+import shutil
 import uuid
 import time
-import libtmux
 import pytest
 from datetime import datetime
 
-from src.agents.manager import AgentManager
-from src.core.database import DatabaseManager, Agent, AgentLog, Task
-from src.interfaces import get_llm_provider
+# Skip the whole file up front, without probing a tmux server at collection
+pytest.importorskip("libtmux")
+pytestmark = pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux binary required")
+
+from src.agents.manager import AgentManager  # noqa: E402
+from src.core.database import Base, DatabaseManager, Agent, AgentLog, Task  # noqa: E402
+from src.interfaces import get_llm_provider  # noqa: E402
 
 
 @pytest.mark.integration
+@pytest.mark.xdist_group(name="tmux")
 class TestAgentOutputIntegration:
     """Integration tests for agent output capture with real components."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def db_manager(self):
-        """Create a real database manager with test database."""
-        # Use an in-memory database for testing
-        import tempfile
-        import os
-
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
-            db_path = tmp.name
+        """Create a real database manager backed by an in-memory database.
 
-        # Initialize database
-        from src.core.database import Base
-        from sqlalchemy import create_engine
-
-        test_engine = create_engine(f"sqlite:///{db_path}")
-        Base.metadata.create_all(test_engine)
-
-        # Create database manager
-        db_manager = DatabaseManager(db_path)
+        The schema is created once for the class; _clean_tables empties the
+        rows between tests.
+        """
+        # StaticPool keeps every session on the single :memory: connection
+        db_manager = DatabaseManager(":memory:")
+        Base.metadata.create_all(db_manager.engine)
 
         yield db_manager
 
-        # Cleanup
+        db_manager.engine.dispose()
+
+    @pytest.fixture(autouse=True)
+    def _clean_tables(self, db_manager):
+        """Delete all rows left behind by the previous test."""
+        yield
+        session = db_manager.get_session()
         try:
-            os.unlink(db_path)
-        except:
-            pass
+            for table in reversed(Base.metadata.sorted_tables):
+                session.execute(table.delete())
+            session.commit()
+        finally:
+            session.close()
 
     @pytest.fixture
     def agent_manager(self, db_manager):
@@ -51,42 +61,17 @@ class TestAgentOutputIntegration:
         return AgentManager(db_manager, llm_provider)
 
     @pytest.mark.asyncio
-    @pytest.mark.skipif(not libtmux.Server().has_session("test"), reason="Requires tmux")
-    async def test_full_agent_lifecycle_with_output_capture(self, agent_manager, db_manager):
+    async def test_full_agent_lifecycle_with_output_capture(
+        self, agent_manager, db_manager, tmux_server, tmux_session
+    ):
         """Test complete agent lifecycle with output capture."""
-
-        # Create a task
-        session = db_manager.get_session()
         task_id = str(uuid.uuid4())
         agent_id = str(uuid.uuid4())
 
-        task = Task(
-            id=task_id,
-            raw_description="Test task",
-            enriched_description="Test task enriched",
-            done_definition="Complete the test",
-            status="pending",
-            priority="medium",
-            created_at=datetime.utcnow()
-        )
-        session.add(task)
-        session.commit()
-        session.close()
-
-        # Create a tmux session manually to simulate an agent
-        tmux_server = libtmux.Server()
-        session_name = f"test_agent_{agent_id[:8]}"
-
-        # Clean up any existing test session
-        if tmux_server.has_session(session_name):
-            tmux_server.get_by_id(session_name).kill_session()
-
-        # Create new session
-        tmux_session = tmux_server.new_session(
-            session_name=session_name,
-            window_name="test",
-            attach=False
-        )
+        # Simulate the agent with a session on the shared test tmux server;
+        # terminate_agent kills it, and the fixtures clean up if it doesn't
+        agent_manager.tmux_server = tmux_server
+        session_name = tmux_session.name
 
         # Add some output to the session
         pane = tmux_session.attached_window.attached_pane
@@ -97,55 +82,72 @@ class TestAgentOutputIntegration:
             "echo 'Final result: SUCCESS'"
         ]
 
-        for cmd in test_commands:
-            pane.send_keys(cmd, enter=True)
-            time.sleep(0.1)  # Small delay between commands
-
-        # Register agent in database
-        session = db_manager.get_session()
-        agent = Agent(
-            id=agent_id,
-            system_prompt="Test prompt",
-            status="working",
-            cli_type="test",
-            tmux_session_name=session_name,
-            current_task_id=task_id,
-            last_activity=datetime.utcnow(),
-            health_check_failures=0,
-            agent_type="phase"
-        )
-        session.add(agent)
-        session.commit()
-        session.close()
-
-        # Verify agent can get live output
-        live_output = agent_manager.get_agent_output(agent_id, lines=100)
-        assert "Starting test agent" in live_output
-        assert "Task completed successfully" in live_output
-
-        # Terminate the agent
-        await agent_manager.terminate_agent(agent_id)
-
-        # Verify agent is terminated
+        # Send everything in one line and poll until the sentinel shows up,
+        # instead of sleeping a fixed interval per command
+        pane.send_keys("; ".join(test_commands) + "; echo __SENTINEL__", enter=True)
+        for _ in range(50):
+            output = pane.cmd("capture-pane", "-p", "-S", "-1000").stdout
+            # The typed command line also contains the sentinel, so wait for
+            # it to appear on a line of its own (the echo's output)
+            if any(line.strip() == "__SENTINEL__" for line in output):
+                break
+            time.sleep(0.02)
+
+        # One session for the whole test; commit() expires loaded objects,
+        # so reads after terminate_agent see the rows it wrote
         session = db_manager.get_session()
-        agent = session.query(Agent).filter_by(id=agent_id).first()
-        assert agent.status == "terminated"
-
-        # Verify output was captured in AgentLog
-        log_entry = session.query(AgentLog).filter_by(
-            agent_id=agent_id,
-            log_type="terminated"
-        ).first()
-        assert log_entry is not None
-        assert log_entry.details is not None
-        assert "final_output" in log_entry.details
-
-        stored_output = log_entry.details["final_output"]
-        assert "Starting test agent" in stored_output
-        assert "Task completed successfully" in stored_output
-        assert "Final result: SUCCESS" in stored_output
-
-        session.close()
+        try:
+            # Create the task and register the agent in one commit
+            session.add(Task(
+                id=task_id,
+                raw_description="Test task",
+                enriched_description="Test task enriched",
+                done_definition="Complete the test",
+                status="pending",
+                priority="medium",
+                created_at=datetime.utcnow()
+            ))
+            agent = Agent(
+                id=agent_id,
+                system_prompt="Test prompt",
+                status="working",
+                cli_type="test",
+                tmux_session_name=session_name,
+                current_task_id=task_id,
+                last_activity=datetime.utcnow(),
+                health_check_failures=0,
+                agent_type="phase"
+            )
+            session.add(agent)
+            session.commit()
+
+            # Verify agent can get live output
+            live_output = agent_manager.get_agent_output(agent_id, lines=100)
+            assert "Starting test agent" in live_output
+            assert "Task completed successfully" in live_output
+
+            # Terminate the agent
+            await agent_manager.terminate_agent(agent_id)
+
+            # Verify agent is terminated
+            agent = session.query(Agent).filter_by(id=agent_id).first()
+            assert agent.status == "terminated"
+
+            # Verify output was captured in AgentLog
+            log_entry = session.query(AgentLog).filter_by(
+                agent_id=agent_id,
+                log_type="terminated"
+            ).first()
+            assert log_entry is not None
+            assert log_entry.details is not None
+            assert "final_output" in log_entry.details
+
+            stored_output = log_entry.details["final_output"]
+            assert "Starting test agent" in stored_output
+            assert "Task completed successfully" in stored_output
+            assert "Final result: SUCCESS" in stored_output
+        finally:
+            session.close()
 
         # Verify we can still get output after termination
         terminated_output = agent_manager.get_agent_output(agent_id)
@@ -1,15 +1,22 @@
-"""Tests for authentication functionality."""
+"""Tests for authentication functionality.
 
+The tests are independent and can run in parallel with pytest-xdist
+(``pytest -n auto tests/test_authentication.py``).
+"""
+
+import asyncio
+import functools
+import hashlib
+import hmac
+import itertools
 import pytest
 import uuid
 from datetime import datetime, timedelta
-from jose import jwt
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
-from src.core.database import Base, DatabaseManager
+from src.core.database import Base
 from src.core.user_models import User
 from src.auth import (
     hash_password,
@@ -24,8 +31,78 @@ from src.auth import (
 from src.auth.auth_config import get_auth_config
 
 
+def _stub_hash_password(password: str) -> str:
+    """Deterministic SHA-256 stand-in for bcrypt used on the API path."""
+    return "sha256$" + hashlib.sha256(password.encode()).hexdigest()
+
+
+def _stub_verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a _stub_hash_password() hash.
+
+    Compares in constant time, like the bcrypt verifier it replaces.
+    """
+    return hmac.compare_digest(hashed_password, _stub_hash_password(plain_password))
+
+
+# Row IDs only need to be unique, so a counter stands in for uuid4()
+_uid = itertools.count(1)
+
+
+def _next_id() -> str:
+    """Return the next unique UUID-formatted ID for test rows."""
+    return str(uuid.UUID(int=next(_uid)))
+
+
+class _ShiftedDatetime(datetime):
+    """datetime whose utcnow() runs ``offset`` ahead of the real clock.
+
+    Patched into auth_utils so a test can move token timestamps forward
+    instead of sleeping.
+    """
+
+    offset = timedelta(0)
+
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + cls.offset
+
+
+@functools.lru_cache(maxsize=None)
+def _hp(password: str) -> str:
+    """Real bcrypt hash of ``password``, computed once per distinct literal.
+
+    Tests that only verify against a stored hash can share it; tests that
+    check salting must call hash_password() directly.
+    """
+    return hash_password(password)
+
+
+@pytest.fixture(scope="module")
+def stub_password_hashing():
+    """Replace bcrypt in the auth API with the SHA-256 stub (via test_client).
+
+    Registration and login only need hashing to round-trip, so the API tests
+    skip bcrypt's deliberately expensive key schedule. Users seeded directly
+    in the database must store _stub_hash_password() hashes.
+    TestPasswordHashing calls the real functions imported above.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("src.auth.auth_api.hash_password", _stub_hash_password)
+        mp.setattr("src.auth.auth_api.verify_password", _stub_verify_password)
+        yield
+
+
 class TestPasswordHashing:
-    """Test password hashing functions."""
+    """Test password hashing functions (real bcrypt, at the minimum cost)."""
+
+    @pytest.fixture(autouse=True)
+    def low_cost_bcrypt(self, monkeypatch):
+        """Hash with 4 bcrypt rounds; the format and semantics are unchanged."""
+        from src.auth import auth_utils
+
+        monkeypatch.setattr(
+            auth_utils, "pwd_context", auth_utils.pwd_context.copy(bcrypt__rounds=4)
+        )
 
     def test_hash_password(self):
         """Test password hashing."""
@@ -39,7 +116,7 @@ class TestPasswordHashing:
     def test_verify_password_correct(self):
         """Test verifying correct password."""
         password = "TestPassword123!"
-        hashed = hash_password(password)
+        hashed = _hp(password)
 
         assert verify_password(password, hashed) is True
 
@@ -47,7 +124,7 @@ class TestPasswordHashing:
         """Test verifying incorrect password."""
         password = "TestPassword123!"
         wrong_password = "WrongPassword456!"
-        hashed = hash_password(password)
+        hashed = _hp(password)
 
         assert verify_password(wrong_password, hashed) is False
 
@@ -115,23 +192,25 @@ class TestJWTTokens:
 
     def test_access_token_expiry(self):
         """Test access token expiration."""
+        from jose import jwt
+
         config = get_auth_config()
         data = {"sub": "user123", "email": "test@example.com"}
 
-        # Create token with 1 second expiry
+        # Should be valid while unexpired
         token = create_access_token(data, expires_delta=timedelta(seconds=1))
-
-        # Should be valid immediately
-        payload = verify_access_token(token)
-        assert payload is not None
-
-        # Wait for expiration
-        import time
-        time.sleep(2)
+        assert verify_access_token(token) is not None
+
+        # Mint an access token that expired a second ago instead of waiting
+        now = datetime.utcnow()
+        expired_token = jwt.encode(
+            {**data, "type": "access", "iat": now - timedelta(seconds=2), "exp": now - timedelta(seconds=1)},
+            config.jwt_secret_key,
+            algorithm=config.jwt_algorithm,
+        )
 
         # Should be invalid after expiry
-        payload = verify_access_token(token)
-        assert payload is None
+        assert verify_access_token(expired_token) is None
 
     def test_create_token_pair(self):
         """Test creating token pair."""
@@ -168,39 +247,111 @@ class TestJWTTokens:
         assert hash1 != token
 
 
-@pytest.fixture
-def test_db():
-    """Create a test database."""
+def seed_user(db, email, username, password, **overrides):
+    """Insert an active user straight into the table and commit.
+
+    Skips the ORM unit of work; column defaults still apply. The password is
+    stored as a _stub_hash_password() hash so the stubbed login accepts it.
+    """
+    db.bulk_insert_mappings(User, [{
+        "id": _next_id(),
+        "email": email,
+        "username": username,
+        "password_hash": _stub_hash_password(password),
+        "status": "active",
+        **overrides,
+    }])
+    db.commit()
+
+
+@pytest.fixture(scope="session")
+def test_engine():
+    """Create the in-memory test engine and schema once per test session.
+
+    Every xdist worker is its own process with its own session, so each
+    worker gets a private :memory: database (kept alive by StaticPool) and
+    workers never share rows.
+    """
     engine = create_engine(
         "sqlite:///:memory:",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+
+    # pysqlite defers BEGIN and breaks SAVEPOINT handling; let SQLAlchemy
+    # emit BEGIN itself so per-test savepoints work
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def warm_user_insert(test_engine):
+    """Compile the User INSERT statements once per test session.
+
+    Runs both the ORM add path used by the endpoints and the bulk path used
+    by seed_user(), then rolls back. The compiled statements stay in the
+    engine's compiled cache, so the first test that creates a user doesn't
+    pay for SQL compilation.
+    """
+    with Session(test_engine) as session:
+        session.add(User(
+            id=_next_id(),
+            email="warmup@example.com",
+            username="warmup",
+            password_hash=_stub_hash_password("warmup"),
+        ))
+        session.flush()
+        session.bulk_insert_mappings(User, [{
+            "id": _next_id(),
+            "email": "warmup2@example.com",
+            "username": "warmup2",
+            "password_hash": _stub_hash_password("warmup"),
+            "status": "active",
+        }])
+        session.rollback()
+    return test_engine
+
+
+@pytest.fixture
+def test_db(test_engine, warm_user_insert):
+    """Provide a session whose changes are rolled back after each test.
+
+    The session joins an outer transaction and turns its own commits into
+    SAVEPOINT releases, so code under test can commit freely.
+    """
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
 
-    db = SessionLocal()
     yield db
+
     db.close()
+    transaction.rollback()
+    connection.close()
 
 
-@pytest.fixture
-def test_client(test_db, monkeypatch):
-    """Create a test client with test database."""
+@pytest.fixture(scope="module")
+def app_client():
+    """Create one TestClient for the module's API tests."""
+    from fastapi.testclient import TestClient
     from src.mcp.server import app
-    from unittest.mock import Mock
 
-    def get_test_db():
-        try:
-            yield test_db
-        finally:
-            pass
+    return TestClient(app)
 
-    # Monkey patch the database dependency
-    from src.core import database
-    monkeypatch.setattr(database, "get_db", get_test_db)
 
-    # Monkey patch get_db_manager in auth_api to use test database
+@pytest.fixture
+def test_client(app_client, test_db, stub_password_hashing, monkeypatch):
+    """Point the auth API at this test's database and return the shared client."""
+
     # Create a mock DatabaseManager that uses the test session
     class MockDatabaseManager:
         """Mock DatabaseManager that uses test database session."""
@@ -217,12 +368,25 @@ def test_client(test_db, monkeypatch):
             """Return test database session as context manager (alias)."""
             return self.get_session()
 
-    # Patch get_db_manager function in auth_api
+    # The auth endpoints call get_db_manager() directly rather than through
+    # Depends(), so it is patched instead of using app.dependency_overrides
     import src.auth.auth_api
     monkeypatch.setattr(src.auth.auth_api, "get_db_manager", lambda: MockDatabaseManager())
 
-    client = TestClient(app)
-    return client
+    return app_client
+
+
+@pytest.fixture
+async def async_client(test_client):
+    """Async HTTP client on the same app and test database as test_client.
+
+    Lets tests issue independent requests concurrently with asyncio.gather.
+    """
+    import httpx
+
+    transport = httpx.ASGITransport(app=test_client.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
 
 
 class TestAuthenticationAPI:
@@ -250,30 +414,26 @@ class TestAuthenticationAPI:
         assert "id" in data
         assert "created_at" in data
 
-    def test_register_duplicate_email(self, test_client):
+    async def test_register_duplicate_email(self, async_client):
         """Test registration with duplicate email."""
-        # Register first user
-        test_client.post(
-            "/api/auth/register",
-            json={
-                "email": "duplicate@example.com",
-                "username": "user1",
-                "password": "SecurePassword123!"
-            }
-        )
-
-        # Try to register with same email
-        response = test_client.post(
-            "/api/auth/register",
-            json={
-                "email": "duplicate@example.com",
-                "username": "user2",
-                "password": "SecurePassword123!"
-            }
-        )
-
-        assert response.status_code == 400  # Application logic error
-        assert "Email already registered" in response.json()["detail"]
+        # Register two users with the same email at once; whichever request
+        # lands second must be rejected
+        responses = await asyncio.gather(*(
+            async_client.post(
+                "/api/auth/register",
+                json={
+                    "email": "duplicate@example.com",
+                    "username": username,
+                    "password": "SecurePassword123!"
+                }
+            )
+            for username in ("user1", "user2")
+        ))
+
+        status_codes = sorted(response.status_code for response in responses)
+        assert status_codes == [200, 400]  # 400: application logic error
+        rejected = next(r for r in responses if r.status_code == 400)
+        assert "Email already registered" in rejected.json()["detail"]
 
     def test_register_weak_password(self, test_client):
         """Test registration with weak password."""
@@ -294,18 +454,13 @@ class TestAuthenticationAPI:
     def test_login_success(self, test_client, test_db):
         """Test successful login."""
         # Create a test user directly in database
-        from src.core.user_models import User as UserModel
-
-        user = UserModel(
-            id=str(uuid.uuid4()),
+        seed_user(
+            test_db,
             email="testuser@example.com",
             username="testuser",
-            password_hash=hash_password("TestPassword123!"),
-            status="active",
+            password="TestPassword123!",
             email_verified=True
         )
-        test_db.add(user)
-        test_db.commit()
 
         # Login
         response = test_client.post(
@@ -326,17 +481,12 @@ class TestAuthenticationAPI:
     def test_login_wrong_password(self, test_client, test_db):
         """Test login with wrong password."""
         # Create a test user
-        from src.core.user_models import User as UserModel
-
-        user = UserModel(
-            id=str(uuid.uuid4()),
+        seed_user(
+            test_db,
             email="wrongpass@example.com",
             username="wrongpassuser",
-            password_hash=hash_password("CorrectPassword123!"),
-            status="active"
+            password="CorrectPassword123!"
         )
-        test_db.add(user)
-        test_db.commit()
 
         # Try login with wrong password
         response = test_client.post(
@@ -363,23 +513,19 @@ class TestAuthenticationAPI:
         assert response.status_code == 401
         assert "Invalid email or password" in response.json()["detail"]
 
-    def test_refresh_token_valid(self, test_client, test_db):
+    async def test_refresh_token_valid(self, async_client, test_db, monkeypatch):
         """Test refreshing token with valid refresh token."""
-        from src.core.user_models import User as UserModel, AuthToken
-
         # Create user and login
-        user = UserModel(
-            id=str(uuid.uuid4()),
+        seed_user(
+            test_db,
             email="refresh@example.com",
             username="refreshuser",
-            password_hash=hash_password("TestPassword123!"),
-            status="active"
+            password="TestPassword123!"
         )
-        test_db.add(user)
-        test_db.commit()
 
         # Login to get tokens
-        login_response = test_client.post(
+        monkeypatch.setattr("src.auth.auth_utils.datetime", _ShiftedDatetime)
+        login_response = await async_client.post(
             "/api/auth/login",
             data={
                 "username": "refresh@example.com",
@@ -388,12 +534,11 @@ class TestAuthenticationAPI:
         )
         tokens = login_response.json()
 
-        # Sleep briefly to ensure different iat timestamp
-        import time
-        time.sleep(1)
+        # Move the token clock forward to ensure a different iat timestamp
+        monkeypatch.setattr(_ShiftedDatetime, "offset", timedelta(seconds=1))
 
         # Refresh token
-        response = test_client.post(
+        response = await async_client.post(
             "/api/auth/refresh",
             json={
                 "refresh_token": tokens["refresh_token"]
@@ -419,22 +564,23 @@ class TestAuthenticationAPI:
         assert "Invalid refresh token" in response.json()["detail"]
 
 
+@pytest.mark.skip(reason="protected endpoints not implemented")
 class TestAuthenticationMiddleware:
     """Test authentication middleware."""
 
-    def test_protected_route_without_token(self, test_client):
+    def test_protected_route_without_token(self):
         """Test accessing protected route without token."""
         # This would be a protected endpoint
         # response = test_client.get("/api/protected")
         # assert response.status_code == 401
         pass  # TODO: Add when protected endpoints are implemented
 
-    def test_protected_route_with_valid_token(self, test_client, test_db):
+    def test_protected_route_with_valid_token(self):
         """Test accessing protected route with valid token."""
         # TODO: Add when protected endpoints are implemented
         pass
 
-    def test_protected_route_with_expired_token(self, test_client):
+    def test_protected_route_with_expired_token(self):
         """Test accessing protected route with expired token."""
         # TODO: Add when protected endpoints are implemented
-        pass
\ No newline at end of file
+        pass
@@ -1,29 +1,200 @@
 """Unit tests for the Conductor system orchestration."""
 
 import pytest
-import asyncio
-from unittest.mock import Mock, AsyncMock, patch
-from datetime import datetime, timedelta
+from unittest.mock import Mock, create_autospec, patch
+from datetime import datetime
 
 from src.monitoring.conductor import Conductor, SystemDecision
-from src.core.database import AgentLog
+from src.core.database import DatabaseManager
+from src.agents.manager import AgentManager
+from src.interfaces.multi_provider_llm import MultiProviderLLM
+
+
+# Decision type strings as they appear in conductor output
+TERMINATE = SystemDecision.TERMINATE_DUPLICATE.value
+COORDINATE = SystemDecision.COORDINATE_RESOURCES.value
+ESCALATE = SystemDecision.ESCALATE.value
+
+# Fixed "now" for the frozen_clock fixture
+FROZEN_NOW = datetime(2025, 1, 1)
+FROZEN_NOW_ISO = FROZEN_NOW.isoformat()
+
+
+class _FrozenDatetime(datetime):
+    """datetime whose utcnow() always returns FROZEN_NOW."""
+
+    @classmethod
+    def utcnow(cls):
+        return FROZEN_NOW
+
+
+# Canned analyze_system_coherence responses for the llm_mock fixture
+DUPLICATES_RESPONSE = {
+    "coherence_score": 0.5,
+    "duplicates": [
+        {
+            "agent1": "agent-1",
+            "agent2": "agent-2",
+            "similarity": 0.9,
+            "work": "Both implementing authentication"
+        }
+    ],
+    "alignment_issues": ["Two agents duplicating work"],
+    "termination_recommendations": [
+        {
+            "agent_id": "agent-2",
+            "reason": "Duplicate with agent-1"
+        }
+    ],
+    "coordination_needs": [],
+    "system_summary": "System has duplicates needing resolution"
+}
+
+LOW_COHERENCE_RESPONSE = {
+    "coherence_score": 0.3,  # Very low coherence
+    "duplicates": [],
+    "alignment_issues": [
+        "Agents working on unrelated tasks",
+        "No coordination between agents"
+    ],
+    "termination_recommendations": [],
+    "coordination_needs": [],
+    "system_summary": "System coherence critically low"
+}
+
+COORDINATION_RESPONSE = {
+    "coherence_score": 0.7,
+    "duplicates": [],
+    "alignment_issues": [],
+    "termination_recommendations": [],
+    "coordination_needs": [
+        {
+            "agents": ["agent-1", "agent-2"],
+            "resource": "database/schema.sql",
+            "action": "agent-1 goes first"
+        }
+    ],
+    "system_summary": "Good coherence but needs coordination"
+}
+
+
+# Guardian summaries for the analyze_system_state cases
+AGENT_SUMMARIES = [
+    {
+        "agent_id": "agent-1",
+        "trajectory_summary": "Implementing auth module",
+        "accumulated_goal": "Build JWT authentication",
+        "current_phase": "implementation",
+        "trajectory_aligned": True,
+    },
+    {
+        "agent_id": "agent-2",
+        "trajectory_summary": "Creating auth system",
+        "accumulated_goal": "Implement JWT auth",
+        "current_phase": "implementation",
+        "trajectory_aligned": True,
+    }
+]
+
+
+def _assert_duplicate_terminated(result):
+    """Conductor detects duplicate work and terminates the duplicate."""
+    assert len(result['duplicates']) == 1
+    assert result['duplicates'][0]['agent1'] == "agent-1"
+    assert result['duplicates'][0]['agent2'] == "agent-2"
+    assert result['coherence']['score'] == 0.5
+
+    # Check decisions
+    assert len(result['decisions']) == 1
+    assert result['decisions'][0]['type'] == TERMINATE
+    assert result['decisions'][0]['target'] == "agent-2"
+
+
+def _assert_low_coherence_escalated(result):
+    """Conductor escalates when system coherence is too low."""
+    assert result['coherence']['score'] == 0.3
+    escalation_decisions = [d for d in result['decisions']
+                            if d['type'] == ESCALATE]
+    assert len(escalation_decisions) == 1
+    assert "too low" in escalation_decisions[0]['reason']
+
+
+def _assert_resource_coordinated(result):
+    """Conductor identifies resource coordination needs."""
+    coord_decisions = [d for d in result['decisions']
+                       if d['type'] == COORDINATE]
+    assert len(coord_decisions) == 1
+    assert coord_decisions[0]['resource'] == "database/schema.sql"
+    assert set(coord_decisions[0]['agents']) == {"agent-1", "agent-2"}
+
+
+@pytest.fixture(scope="module")
+def _db_manager_spec():
+    """Build the autospecced database manager once per module."""
+    return create_autospec(DatabaseManager, instance=True, spec_set=True)
+
+
+@pytest.fixture(scope="module")
+def _agent_manager_spec():
+    """Build the autospecced agent manager once per module.
+
+    Autospec turns terminate_agent and send_message_to_agent into AsyncMocks,
+    so they can be awaited.
+    """
+    return create_autospec(AgentManager, instance=True, spec_set=True)
+
+
+@pytest.fixture(scope="module")
+def _llm_provider_spec():
+    """Build the autospecced LLM provider once per module."""
+    return create_autospec(MultiProviderLLM, instance=True, spec_set=True)
+
+
+def _reset(mock):
+    """Clear calls, return values and side effects left by the previous test."""
+    mock.reset_mock(return_value=True, side_effect=True)
+    return mock
 
 
 @pytest.fixture
-def mock_db_manager():
+def mock_db_manager(_db_manager_spec):
     """Create mock database manager."""
-    mock = Mock()
-    mock.get_session = Mock()
-    return mock
+    return _reset(_db_manager_spec)
 
 
 @pytest.fixture
-def mock_agent_manager():
+def mock_agent_manager(_agent_manager_spec):
     """Create mock agent manager."""
-    mock = Mock()
-    mock.send_message_to_agent = AsyncMock()  # Must be AsyncMock for await
-    mock.terminate_agent = AsyncMock()
-    return mock
+    return _reset(_agent_manager_spec)
+
+
+@pytest.fixture
+def llm_mock(request, monkeypatch, _llm_provider_spec):
+    """Install an LLM provider mock whose analysis returns ``request.param``.
+
+    Use with indirect parametrization. An exception instance as the param is
+    raised from analyze_system_coherence instead of returned.
+    """
+    response = request.param
+    mock_llm = _reset(_llm_provider_spec)
+    mock_llm.get_model_for_component.return_value = "gpt-5"
+    if isinstance(response, Exception):
+        mock_llm.analyze_system_coherence.side_effect = response
+    else:
+        mock_llm.analyze_system_coherence.return_value = response
+
+    # Patch where it's used, not where it's defined
+    monkeypatch.setattr('src.interfaces.get_llm_provider', lambda: mock_llm)
+    return mock_llm
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Pin the conductor module's clock to FROZEN_NOW."""
+    monkeypatch.setattr(
+        'src.c2_monitoring_guardian.conductor.datetime', _FrozenDatetime
+    )
+    return FROZEN_NOW
 
 
 @pytest.fixture
@@ -35,131 +206,27 @@ def conductor(mock_db_manager, mock_agent_manager):
     )
 
 
+@pytest.mark.usefixtures("frozen_clock")
 class TestConductor:
     """Test the Conductor system orchestration."""
 
     @pytest.mark.asyncio
-    async def test_analyze_system_state_with_duplicates(self, conductor):
-        """Test Conductor detects duplicate work."""
-        # Mock LLM provider - patch where it's used, not where it's defined
-        with patch('src.interfaces.get_llm_provider') as mock_get_llm:
-            mock_llm = AsyncMock()
-            mock_llm.get_model_for_component = Mock(return_value="gpt-5")  # Non-async mock
-            mock_llm.analyze_system_coherence = AsyncMock(return_value={
-                "coherence_score": 0.5,
-                "duplicates": [
-                    {
-                        "agent1": "agent-1",
-                        "agent2": "agent-2",
-                        "similarity": 0.9,
-                        "work": "Both implementing authentication"
-                    }
-                ],
-                "alignment_issues": ["Two agents duplicating work"],
-                "termination_recommendations": [
-                    {
-                        "agent_id": "agent-2",
-                        "reason": "Duplicate with agent-1"
-                    }
-                ],
-                "coordination_needs": [],
-                "system_summary": "System has duplicates needing resolution"
-            })
-            mock_get_llm.return_value = mock_llm
-
-            # Guardian summaries showing duplicate work
-            summaries = [
-                {
-                    "agent_id": "agent-1",
-                    "trajectory_summary": "Implementing auth module",
-                    "accumulated_goal": "Build JWT authentication",
-                    "current_phase": "implementation",
-                    "trajectory_aligned": True,
-                },
-                {
-                    "agent_id": "agent-2",
-                    "trajectory_summary": "Creating auth system",
-                    "accumulated_goal": "Implement JWT auth",
-                    "current_phase": "implementation",
-                    "trajectory_aligned": True,
-                }
-            ]
-
-            # Execute
-            result = await conductor.analyze_system_state(summaries)
+    @pytest.mark.parametrize(
+        "llm_mock, check",
+        [
+            (DUPLICATES_RESPONSE, _assert_duplicate_terminated),
+            (LOW_COHERENCE_RESPONSE, _assert_low_coherence_escalated),
+            (COORDINATION_RESPONSE, _assert_resource_coordinated),
+        ],
+        indirect=["llm_mock"],
+        ids=["duplicates", "low_coherence", "coordination_needs"],
+    )
+    async def test_analyze_system_state(self, conductor, llm_mock, check):
+        """Test Conductor turns the LLM analysis into system decisions."""
+        result = await conductor.analyze_system_state(AGENT_SUMMARIES)
 
-        # Assert
         assert result['num_agents'] == 2
-        assert len(result['duplicates']) == 1
-        assert result['duplicates'][0]['agent1'] == "agent-1"
-        assert result['duplicates'][0]['agent2'] == "agent-2"
-        assert result['coherence']['score'] == 0.5
-
-        # Check decisions
-        assert len(result['decisions']) == 1
-        assert result['decisions'][0]['type'] == SystemDecision.TERMINATE_DUPLICATE.value
-        assert result['decisions'][0]['target'] == "agent-2"
-
-    @pytest.mark.asyncio
-    async def test_analyze_system_state_low_coherence(self, conductor):
-        """Test Conductor handles low system coherence."""
-        with patch('src.interfaces.get_llm_provider') as mock_get_llm:
-            mock_llm = AsyncMock()
-            mock_llm.get_model_for_component = Mock(return_value="gpt-5")  # Non-async mock
-            mock_llm.analyze_system_coherence = AsyncMock(return_value={
-                "coherence_score": 0.3,  # Very low coherence
-                "duplicates": [],
-                "alignment_issues": [
-                    "Agents working on unrelated tasks",
-                    "No coordination between agents"
-                ],
-                "termination_recommendations": [],
-                "coordination_needs": [],
-                "system_summary": "System coherence critically low"
-            })
-            mock_get_llm.return_value = mock_llm
-
-            summaries = [{"agent_id": "agent-1"}, {"agent_id": "agent-2"}]
-            result = await conductor.analyze_system_state(summaries)
-
-        # Should escalate due to low coherence
-        assert result['coherence']['score'] == 0.3
-        escalation_decisions = [d for d in result['decisions']
-                               if d['type'] == SystemDecision.ESCALATE.value]
-        assert len(escalation_decisions) == 1
-        assert "too low" in escalation_decisions[0]['reason']
-
-    @pytest.mark.asyncio
-    async def test_analyze_system_state_coordination_needs(self, conductor):
-        """Test Conductor identifies resource coordination needs."""
-        with patch('src.interfaces.get_llm_provider') as mock_get_llm:
-            mock_llm = AsyncMock()
-            mock_llm.get_model_for_component = Mock(return_value="gpt-5")  # Non-async mock
-            mock_llm.analyze_system_coherence = AsyncMock(return_value={
-                "coherence_score": 0.7,
-                "duplicates": [],
-                "alignment_issues": [],
-                "termination_recommendations": [],
-                "coordination_needs": [
-                    {
-                        "agents": ["agent-1", "agent-2"],
-                        "resource": "database/schema.sql",
-                        "action": "agent-1 goes first"
-                    }
-                ],
-                "system_summary": "Good coherence but needs coordination"
-            })
-            mock_get_llm.return_value = mock_llm
-
-            summaries = [{"agent_id": "agent-1"}, {"agent_id": "agent-2"}]
-            result = await conductor.analyze_system_state(summaries)
-
-        # Check coordination decision
-        coord_decisions = [d for d in result['decisions']
-                          if d['type'] == SystemDecision.COORDINATE_RESOURCES.value]
-        assert len(coord_decisions) == 1
-        assert coord_decisions[0]['resource'] == "database/schema.sql"
-        assert set(coord_decisions[0]['agents']) == {"agent-1", "agent-2"}
+        check(result)
 
     @pytest.mark.asyncio
     async def test_empty_summaries(self, conductor):
@@ -178,7 +245,7 @@ class TestConductor:
         mock_db_manager.get_session.return_value = mock_session
 
         decision = {
-            "type": SystemDecision.TERMINATE_DUPLICATE.value,
+            "type": TERMINATE,
             "target": "agent-duplicate",
             "reason": "Duplicate work with agent-primary"
         }
@@ -194,7 +261,7 @@ class TestConductor:
     async def test_execute_resource_coordination(self, conductor, mock_agent_manager):
         """Test executing resource coordination decision."""
         decision = {
-            "type": SystemDecision.COORDINATE_RESOURCES.value,
+            "type": COORDINATE,
             "agents": ["agent-1", "agent-2"],
             "resource": "config.json"
         }
@@ -214,7 +281,7 @@ class TestConductor:
     async def test_execute_escalation(self, conductor):
         """Test executing escalation decision."""
         decision = {
-            "type": SystemDecision.ESCALATE.value,
+            "type": ESCALATE,
             "reason": "System coherence too low",
             "details": ["Multiple issues detected"]
         }
@@ -228,15 +295,11 @@ class TestConductor:
             assert any("CONDUCTOR ESCALATION" in str(call) for call in calls)
 
     @pytest.mark.asyncio
-    async def test_llm_failure_handling(self, conductor):
+    @pytest.mark.parametrize("llm_mock", [Exception("LLM Error")], indirect=True)
+    async def test_llm_failure_handling(self, conductor, llm_mock):
         """Test handling when LLM analysis fails."""
-        with patch('src.interfaces.get_llm_provider') as mock_get_llm:
-            mock_llm = AsyncMock()
-            mock_llm.analyze_system_coherence = AsyncMock(side_effect=Exception("LLM Error"))
-            mock_get_llm.return_value = mock_llm
-
-            summaries = [{"agent_id": "agent-1"}]
-            result = await conductor.analyze_system_state(summaries)
+        summaries = [{"agent_id": "agent-1"}]
+        result = await conductor.analyze_system_state(summaries)
 
         # Should return empty analysis on failure
         assert result['num_agents'] == 0
@@ -250,12 +313,13 @@ class TestConductor:
 
         # After analysis
         conductor.system_state = {
-            "last_analysis": datetime.utcnow(),
+            "last_analysis": FROZEN_NOW,
             "duplicate_pairs": [{"agent1": "a", "agent2": "b"}],
             "coherence_score": 0.75
         }
 
         summary = conductor.get_system_summary()
+        assert "0s ago" in summary
         assert "1 duplicates" in summary
         assert "0.75" in summary
 
@@ -263,7 +327,7 @@ class TestConductor:
     async def test_generate_detailed_report(self, conductor):
         """Test generating detailed system report."""
         analysis = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": FROZEN_NOW_ISO,
             "num_agents": 3,
             "system_status": "3 agents working on tasks",
             "coherence": {
@@ -280,7 +344,7 @@ class TestConductor:
             ],
             "decisions": [
                 {
-                    "type": SystemDecision.TERMINATE_DUPLICATE.value,
+                    "type": TERMINATE,
                     "target": "agent-2",
                     "reason": "Duplicate",
                     "confidence": 0.9
@@ -310,7 +374,7 @@ class TestConductor:
         mock_agent_manager.terminate_agent.side_effect = Exception("Termination failed")
 
         decision = {
-            "type": SystemDecision.TERMINATE_DUPLICATE.value,
+            "type": TERMINATE,
             "target": "agent-fail",
             "reason": "Test"
         }
@@ -1,80 +1,163 @@
-"""Unit tests for the diagnostic agent system."""
+"""Unit tests for the diagnostic agent system.
 
+Runs under pytest-xdist (``pytest -n auto --dist=loadgroup``): the database
+tests share the "db" xdist group so one worker builds the in-memory schema,
+while the prompt tests need no database and spread across workers.
+"""
+
+import copy
+import functools
 import pytest
 import asyncio
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
-import sys
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from sqlalchemy import event, select
+from sqlalchemy.orm import sessionmaker
 
+from src.c2_monitoring_guardian import monitor
 from src.monitoring.monitor import MonitoringLoop
 from src.core.database import (
     DatabaseManager, Agent, Task, Workflow, Phase, WorkflowResult, DiagnosticRun
 )
 from src.core.simple_config import get_config
+from src.agents.manager import AgentManager
+from src.interfaces import LLMProviderInterface
+from src.memory.rag import RAGSystem
+from src.phases import PhaseManager
+
+# All tests share one event loop instead of creating one per test
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+# Collaborator mocks, built once and reset after every test by _reset_mocks
+_AGENT_MGR = Mock(spec_set=AgentManager)
+_AGENT_MGR.create_agent_for_task = AsyncMock(spec_set=AgentManager.create_agent_for_task)
+_AGENT_MGR.get_project_context = AsyncMock(
+    spec_set=AgentManager.get_project_context, return_value="Test context"
+)
 
+_LLM_PROVIDER = Mock(spec_set=LLMProviderInterface)
+_RAG_SYSTEM = Mock(spec_set=RAGSystem)
 
-@pytest.fixture
-def db_manager():
-    """Create a test database manager."""
-    import tempfile
-    import os
+# spec, not spec_set: workflow_id is an instance attribute set in __init__
+_PHASE_MGR = Mock(spec=PhaseManager)
+_PHASE_MGR.workflow_id = "test-workflow-123"
+_PHASE_MGR.get_workflow_config = Mock()
+_PHASE_MGR.get_workflow_config.return_value.result_criteria = (
+    "Test workflow goal: solve the puzzle"
+)
+
+
+@pytest.fixture(scope="session")
+def shared_db_manager():
+    """Create the in-memory test database and its schema once per session.
+
+    DatabaseManager already uses StaticPool with check_same_thread=False, so
+    every session shares the single :memory: connection.
+    """
+    db = DatabaseManager(":memory:")
 
-    # Create temp database
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
+    # pysqlite defers BEGIN and breaks SAVEPOINT handling; let SQLAlchemy
+    # emit BEGIN itself so per-test savepoints work
+    @event.listens_for(db.engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(db.engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # Throwaway database: no durability needed, keep temp structures in RAM
+    @event.listens_for(db.engine, "connect")
+    def _set_test_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
 
-    db = DatabaseManager(path)
     db.create_tables()
+    yield db
+    db.engine.dispose()
+
+
+@pytest.fixture
+def db_manager(shared_db_manager):
+    """Create a test database manager whose writes are rolled back after each test.
+
+    Sessions join an outer transaction and turn their commits into SAVEPOINT
+    releases, so code under test can commit freely. Objects keep their
+    loaded attributes after a commit instead of being reloaded.
+    """
+    connection = shared_db_manager.engine.connect()
+    transaction = connection.begin()
+
+    db = copy.copy(shared_db_manager)
+    db.SessionLocal = sessionmaker(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
 
     yield db
 
-    # Cleanup
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def session(db_manager):
+    """Provide one database session per test for seeding rows."""
+    s = db_manager.get_session()
     try:
-        os.unlink(path)
-    except:
-        pass
+        yield s
+    finally:
+        s.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _cached_prompt_templates():
+    """Read each prompt template from disk once for the whole module."""
+    cached = functools.lru_cache(maxsize=None)(monitor._load_prompt_template)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(monitor, "_load_prompt_template", cached)
+        yield
 
 
 @pytest.fixture
 def mock_agent_manager():
     """Create a mock agent manager."""
-    manager = Mock()
-    manager.create_agent_for_task = AsyncMock()
-    manager.get_project_context = AsyncMock(return_value="Test context")
-    return manager
+    return _AGENT_MGR
 
 
 @pytest.fixture
 def mock_llm_provider():
     """Create a mock LLM provider."""
-    provider = Mock()
-    return provider
+    return _LLM_PROVIDER
 
 
 @pytest.fixture
 def mock_rag_system():
     """Create a mock RAG system."""
-    rag = Mock()
-    return rag
+    return _RAG_SYSTEM
 
 
 @pytest.fixture
-def mock_phase_manager(db_manager):
+def mock_phase_manager():
     """Create a mock phase manager."""
-    manager = Mock()
-    manager.workflow_id = "test-workflow-123"
-    manager.get_workflow_config = Mock()
+    return _PHASE_MGR
 
-    # Create mock workflow config
-    workflow_config = Mock()
-    workflow_config.result_criteria = "Test workflow goal: solve the puzzle"
-    manager.get_workflow_config.return_value = workflow_config
 
-    return manager
+@pytest.fixture(autouse=True)
+def _reset_mocks():
+    """Undo per-test changes to the module-level mocks."""
+    yield
+    _AGENT_MGR.create_agent_for_task.reset_mock(return_value=True)
+    _AGENT_MGR.reset_mock()
+    _LLM_PROVIDER.reset_mock()
+    _RAG_SYSTEM.reset_mock()
+    _PHASE_MGR.reset_mock()
+    _PHASE_MGR.workflow_id = "test-workflow-123"
 
 
 @pytest.fixture
@@ -91,9 +174,28 @@ def monitoring_loop(db_manager, mock_agent_manager, mock_llm_provider, mock_rag_
 
 
 @pytest.fixture
-def workflow_with_phases(db_manager, mock_phase_manager):
-    """Create a test workflow with phases."""
-    session = db_manager.get_session()
+def monitoring_loop_no_db(mock_agent_manager, mock_llm_provider, mock_rag_system, mock_phase_manager):
+    """Create a monitoring loop backed by a MagicMock database manager.
+
+    For tests whose code path never reaches the database.
+    """
+    return MonitoringLoop(
+        db_manager=MagicMock(),
+        agent_manager=mock_agent_manager,
+        llm_provider=mock_llm_provider,
+        rag_system=mock_rag_system,
+        phase_manager=mock_phase_manager,
+    )
+
+
+@pytest.fixture(scope="session")
+def workflow_with_phases(shared_db_manager):
+    """Create a test workflow with phases.
+
+    Inserted once, outside the per-test transactions, so every test sees the
+    same rows. The returned workflow is detached from its session.
+    """
+    session = shared_db_manager.get_session()
     try:
         # Create workflow
         workflow = Workflow(
@@ -102,7 +204,6 @@ def workflow_with_phases(db_manager, mock_phase_manager):
             phases_folder_path="/tmp/test",
             status="active",
         )
-        session.add(workflow)
 
         # Create phases
         phase1 = Phase(
@@ -121,306 +222,224 @@ def workflow_with_phases(db_manager, mock_phase_manager):
             description="Implementation phase",
             done_definitions=["Implement solution"],
         )
-        session.add(phase1)
-        session.add(phase2)
+        # Bulk save skips the unit of work, so reload the workflow afterwards
+        session.bulk_save_objects([workflow, phase1, phase2])
         session.commit()
 
+        workflow = session.get(Workflow, "test-workflow-123")
+        session.expunge(workflow)
         return workflow
     finally:
         session.close()
 
 
-class TestDiagnosticAgentTriggers:
-    """Test diagnostic agent trigger conditions."""
+# Task / diagnostic-run ages relative to the 60s cooldown and stuck minimum
+FIVE_MIN = timedelta(minutes=5)
+THIRTY_S = timedelta(seconds=30)
 
-    @pytest.mark.asyncio
-    async def test_no_trigger_when_no_workflow(self, monitoring_loop):
-        """Should not trigger when no workflow exists."""
-        monitoring_loop.phase_manager.workflow_id = None
 
-        await monitoring_loop._check_workflow_stuck_state()
+def _ago(delta):
+    """Return the UTC time ``delta`` before now."""
+    return datetime.utcnow() - delta
 
-        # Should not create any agents
-        monitoring_loop.agent_manager.create_agent_for_task.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_no_trigger_when_no_tasks(self, monitoring_loop, workflow_with_phases):
-        """Should not trigger when no tasks exist."""
-        await monitoring_loop._check_workflow_stuck_state()
+def seed_rows(session, groups):
+    """Insert rows grouped by table, one executemany per table, and commit.
 
-        # Should not create diagnostic agent
-        monitoring_loop.agent_manager.create_agent_for_task.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_no_trigger_when_tasks_active(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should not trigger when tasks are still active."""
-        session = db_manager.get_session()
-        try:
-            # Create active task
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="in_progress",  # Active
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-            )
-            session.add(task)
-            session.commit()
-        finally:
-            session.close()
+    Args:
+        session: Session to insert through
+        groups: Mapping of Table to a list of row dicts, in insert order
+    """
+    for table, rows in groups.items():
+        session.execute(table.insert(), rows)
+    session.commit()
 
-        await monitoring_loop._check_workflow_stuck_state()
 
-        # Should not create diagnostic agent
-        monitoring_loop.agent_manager.create_agent_for_task.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_no_trigger_when_validated_result_exists(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should not trigger when workflow has validated result."""
-        session = db_manager.get_session()
-        try:
-            # Create completed task
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(minutes=5),
-            )
-            session.add(task)
-
-            # Create validated result
-            result = WorkflowResult(
-                id="result-1",
-                workflow_id="test-workflow-123",
-                agent_id="agent-1",
-                result_file_path="/tmp/result.md",
-                result_content="Success!",
-                status="validated",
-            )
-            session.add(result)
-            session.commit()
-        finally:
-            session.close()
+def _task_row(status="done", completed_at=None):
+    """Row dict for a task in phase 1 of the test workflow."""
+    return dict(
+        id="task-1",
+        raw_description="Test task",
+        enriched_description="Test task",
+        done_definition="Complete test",
+        status=status,
+        workflow_id="test-workflow-123",
+        phase_id="phase-1",
+        completed_at=completed_at,
+    )
 
-        await monitoring_loop._check_workflow_stuck_state()
 
-        # Should not create diagnostic agent
-        monitoring_loop.agent_manager.create_agent_for_task.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_no_trigger_during_cooldown(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should not trigger if cooldown hasn't passed."""
-        session = db_manager.get_session()
-        try:
-            # Create completed task
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(minutes=5),
-            )
-            session.add(task)
-
-            # Create recent diagnostic run (within cooldown)
-            diagnostic = DiagnosticRun(
-                id="diag-1",
-                workflow_id="test-workflow-123",
-                triggered_at=datetime.utcnow() - timedelta(seconds=30),  # 30s ago < 60s cooldown
-                total_tasks_at_trigger=1,
-                done_tasks_at_trigger=1,
-                failed_tasks_at_trigger=0,
-                time_since_last_task_seconds=300,
-                workflow_goal="Test goal",
-            )
-            session.add(diagnostic)
-            session.commit()
-        finally:
-            session.close()
+def _seed_no_tasks(monitoring_loop, session):
+    """The workflow has no tasks."""
 
-        await monitoring_loop._check_workflow_stuck_state()
 
-        # Should not create diagnostic agent
-        monitoring_loop.agent_manager.create_agent_for_task.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_no_trigger_when_not_stuck_long_enough(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should not trigger if stuck time is too short."""
-        session = db_manager.get_session()
-        try:
-            # Create recently completed task
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(seconds=30),  # 30s ago < 60s minimum
-            )
-            session.add(task)
-            session.commit()
-        finally:
-            session.close()
+def _seed_tasks_active(monitoring_loop, session):
+    """Tasks are still active."""
+    seed_rows(session, {Task.__table__: [_task_row(status="in_progress")]})
 
-        await monitoring_loop._check_workflow_stuck_state()
 
-        # Should not create diagnostic agent
-        monitoring_loop.agent_manager.create_agent_for_task.assert_not_called()
+def _seed_validated_result(monitoring_loop, session):
+    """The workflow has a validated result."""
+    seed_rows(session, {
+        Task.__table__: [_task_row(completed_at=_ago(FIVE_MIN))],
+        WorkflowResult.__table__: [dict(
+            id="result-1",
+            workflow_id="test-workflow-123",
+            agent_id="agent-1",
+            result_file_path="/tmp/result.md",
+            result_content="Success!",
+            status="validated",
+        )],
+    })
+
+
+def _seed_recent_diagnostic(monitoring_loop, session):
+    """The cooldown since the last diagnostic run hasn't passed."""
+    seed_rows(session, {
+        Task.__table__: [_task_row(completed_at=_ago(FIVE_MIN))],
+        DiagnosticRun.__table__: [dict(
+            id="diag-1",
+            workflow_id="test-workflow-123",
+            triggered_at=_ago(THIRTY_S),  # 30s ago < 60s cooldown
+            total_tasks_at_trigger=1,
+            done_tasks_at_trigger=1,
+            failed_tasks_at_trigger=0,
+            time_since_last_task_seconds=300,
+            workflow_goal="Test goal",
+        )],
+    })
+
+
+def _seed_recently_finished(monitoring_loop, session):
+    """The workflow hasn't been stuck long enough."""
+    # 30s ago < 60s minimum
+    seed_rows(session, {Task.__table__: [_task_row(completed_at=_ago(THIRTY_S))]})
+
+
+def _seed_stuck_workflow(monitoring_loop, session):
+    """All trigger conditions are met."""
+    # 5 min ago > 60s minimum
+    seed_rows(session, {Task.__table__: [_task_row(completed_at=_ago(FIVE_MIN))]})
+
+    # Mock the agent creation
+    mock_agent = Mock()
+    mock_agent.id = "diagnostic-agent-1"
+    monitoring_loop.agent_manager.create_agent_for_task.return_value = mock_agent
+
 
-    @pytest.mark.asyncio
-    async def test_triggers_when_all_conditions_met(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should trigger diagnostic when all conditions are met."""
+# (seed function, expected create_agent_for_task calls)
+TRIGGER_CASES = [
+    pytest.param(_seed_no_tasks, 0, id="no_tasks"),
+    pytest.param(_seed_tasks_active, 0, id="tasks_active"),
+    pytest.param(_seed_validated_result, 0, id="validated_result_exists"),
+    pytest.param(_seed_recent_diagnostic, 0, id="during_cooldown"),
+    pytest.param(_seed_recently_finished, 0, id="not_stuck_long_enough"),
+    pytest.param(_seed_stuck_workflow, 1, id="all_conditions_met"),
+]
+
+
+@pytest.mark.xdist_group(name="db")
+class TestDiagnosticAgentTriggers:
+    """Test diagnostic agent trigger conditions."""
+
+    async def test_no_trigger_when_no_workflow(self, monitoring_loop_no_db, monkeypatch):
+        """Should not trigger when no workflow exists."""
+        monkeypatch.setattr(monitoring_loop_no_db.config, "diagnostic_agent_enabled", True)
+        monitoring_loop_no_db.phase_manager.workflow_id = None
+
+        await monitoring_loop_no_db._check_workflow_stuck_state()
+
+        # Should not create any agents or touch the database
+        monitoring_loop_no_db.agent_manager.create_agent_for_task.assert_not_called()
+        monitoring_loop_no_db.db_manager.get_session.assert_not_called()
+
+    @pytest.mark.parametrize("seed, expected_calls", TRIGGER_CASES)
+    async def test_stuck_state(
+        self, monitoring_loop, workflow_with_phases, session, monkeypatch, seed, expected_calls
+    ):
+        """Should create a diagnostic agent only when all conditions are met."""
         # Enable diagnostic agent feature
-        monitoring_loop.config.diagnostic_agent_enabled = True
-
-        session = db_manager.get_session()
-        try:
-            # Create old completed task
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(minutes=5),  # 5 min ago > 60s minimum
-            )
-            session.add(task)
-            session.commit()
-        finally:
-            session.close()
-
-        # Mock the agent creation
-        mock_agent = Mock()
-        mock_agent.id = "diagnostic-agent-1"
-        monitoring_loop.agent_manager.create_agent_for_task.return_value = mock_agent
+        monkeypatch.setattr(monitoring_loop.config, "diagnostic_agent_enabled", True)
+
+        seed(monitoring_loop, session)
 
         await monitoring_loop._check_workflow_stuck_state()
 
-        # Should create diagnostic agent
-        monitoring_loop.agent_manager.create_agent_for_task.assert_called_once()
+        assert monitoring_loop.agent_manager.create_agent_for_task.call_count == expected_calls
+
+
+def _seed_context_task(session):
+    """Insert one done task and load the workflow's tasks."""
+    seed_rows(session, {Task.__table__: [_task_row()]})
 
+    return session.execute(
+        select(Task).where(Task.workflow_id == "test-workflow-123")
+    ).scalars().all()
 
+
+@pytest.mark.xdist_group(name="db")
 class TestDiagnosticContextGathering:
     """Test context gathering for diagnostic agents."""
 
-    @pytest.mark.asyncio
-    async def test_gathers_workflow_goal(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should gather workflow goal from config."""
+    async def test_gathers_context(self, monitoring_loop, workflow_with_phases, session):
+        """Should gather the workflow goal and all phases with progress."""
         # Create a completed task
-        session = db_manager.get_session()
-        try:
-            task = Task(
-                id="task-1",
-                raw_description="Test",
-                enriched_description="Test",
-                done_definition="Done",
-                status="done",
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-            )
-            session.add(task)
-            session.commit()
-
-            # Refresh to get the task with all attributes
-            session.refresh(task)
-            tasks = [task]
-
-            context = await monitoring_loop._gather_diagnostic_context(
-                "test-workflow-123",
-                tasks,
-                120.0
-            )
-
-            assert context['workflow_goal'] == "Test workflow goal: solve the puzzle"
-        finally:
-            session.close()
-
-    @pytest.mark.asyncio
-    async def test_gathers_phases_summary(self, monitoring_loop, workflow_with_phases, db_manager):
-        """Should gather all phases with progress."""
-        session = db_manager.get_session()
-        try:
-            task = Task(
-                id="task-1",
-                raw_description="Test",
-                enriched_description="Test",
-                done_definition="Done",
-                status="done",
-                workflow_id="test-workflow-123",
-                phase_id="phase-1",
-            )
-            session.add(task)
-            session.commit()
-
-            # Refresh to get the task with all attributes
-            session.refresh(task)
-            tasks = [task]
-
-            context = await monitoring_loop._gather_diagnostic_context(
-                "test-workflow-123",
-                tasks,
-                120.0
-            )
-
-            assert len(context['phases_summary']) == 2
-            phase1 = context['phases_summary'][0]
-            assert phase1['name'] == "Phase 1"
-            assert phase1['task_count'] == 1
-            assert phase1['done_task_count'] == 1
-        finally:
-            session.close()
+        tasks = _seed_context_task(session)
+
+        context = await monitoring_loop._gather_diagnostic_context(
+            "test-workflow-123",
+            tasks,
+            120.0
+        )
+
+        # Workflow goal comes from the workflow config
+        assert context['workflow_goal'] == "Test workflow goal: solve the puzzle"
+
+        assert len(context['phases_summary']) == 2
+        phase1 = context['phases_summary'][0]
+        assert phase1['name'] == "Phase 1"
+        assert phase1['task_count'] == 1
+        assert phase1['done_task_count'] == 1
+
+
+# Diagnostic context for the prompt tests; _generate_diagnostic_prompt only reads it
+PROMPT_CTX_FIXTURE = {
+    'workflow_goal': "Test goal",
+    'workflow_id': "workflow-123",
+    'phases_summary': [{
+        'id': 'phase-1',
+        'name': 'Phase 1',
+        'order': 1,
+        'description': 'Test phase',
+        'done_definitions': ['Task 1', 'Task 2'],
+        'task_count': 5,
+        'done_task_count': 3,
+    }],
+    'agents_summary': [{
+        'agent_id': 'agent-1',
+        'task_id': 'task-1',
+        'task_description': 'Do something',
+        'task_status': 'done',
+        'completion_notes': 'Completed successfully',
+        'failure_reason': None,
+        'phase_id': 'phase-1',
+        'created_at': '2025-01-01T10:00:00',
+        'agent_type': 'phase',
+    }],
+    'conductor_overviews': [],
+    'submitted_results': [],
+    'total_tasks': 5,
+    'tasks_by_phase': {'Phase 1': {'total': 5, 'done': 3, 'failed': 0}},
+    'time_since_last_task': 120,
+}
 
 
 class TestDiagnosticPromptGeneration:
     """Test diagnostic prompt generation."""
 
-    @pytest.mark.asyncio
-    async def test_generates_valid_prompt(self, monitoring_loop):
+    async def test_generates_valid_prompt(self, monitoring_loop_no_db):
         """Should generate prompt from template."""
-        context = {
-            'workflow_goal': "Test goal",
-            'workflow_id': "workflow-123",
-            'phases_summary': [{
-                'id': 'phase-1',
-                'name': 'Phase 1',
-                'order': 1,
-                'description': 'Test phase',
-                'done_definitions': ['Task 1', 'Task 2'],
-                'task_count': 5,
-                'done_task_count': 3,
-            }],
-            'agents_summary': [{
-                'agent_id': 'agent-1',
-                'task_id': 'task-1',
-                'task_description': 'Do something',
-                'task_status': 'done',
-                'completion_notes': 'Completed successfully',
-                'failure_reason': None,
-                'phase_id': 'phase-1',
-                'created_at': '2025-01-01T10:00:00',
-                'agent_type': 'phase',
-            }],
-            'conductor_overviews': [],
-            'submitted_results': [],
-            'total_tasks': 5,
-            'tasks_by_phase': {'Phase 1': {'total': 5, 'done': 3, 'failed': 0}},
-            'time_since_last_task': 120,
-        }
-
-        prompt = await monitoring_loop._generate_diagnostic_prompt(context)
+        prompt = await monitoring_loop_no_db._generate_diagnostic_prompt(PROMPT_CTX_FIXTURE)
 
         # Check prompt contains key sections
         assert "Test goal" in prompt
@@ -1,17 +1,18 @@
-"""Integration tests for the diagnostic agent system."""
+"""Integration tests for the diagnostic agent system.
+
+Runs under pytest-xdist (``pytest -n auto --dist=loadgroup``): the tests share
+the "diagnostic_integration" xdist group so one worker builds the in-memory
+schema and the monitoring loop, and the module runs alongside other modules
+on the remaining workers.
+"""
 
 import pytest
 import asyncio
-import tempfile
-import os
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
-import sys
-from pathlib import Path
+from sqlalchemy.orm import sessionmaker
 import logging
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from collections import deque
 
 from src.monitoring.monitor import MonitoringLoop
 from src.core.database import (
@@ -19,76 +20,165 @@ from src.core.database import (
 )
 from src.core.simple_config import get_config
 
+# MonitoringLoop is re-exported by src.monitoring.monitor but logs under the
+# module that defines it
+MONITOR_LOGGER = "src.c2_monitoring_guardian.monitor"
+
+# Status report lines when every trigger condition passes
+PASS_CONDITIONS = (
+    "Enabled:              ✅",
+    "Workflow Exists:      ✅",
+    "Has Tasks:            ✅",
+    "All Tasks Finished:   ✅",
+    "No Validated Result:  ✅",
+    "Cooldown Passed:      ✅",
+    "Stuck Long Enough:    ✅",
+)
+
+# All tests run on the session's event loop instead of creating one per test
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
 
 # Capture logs for verification
 class LogCapture(logging.Handler):
-    """Custom logging handler to capture logs."""
-    def __init__(self):
+    """Custom logging handler to capture logs from one logger tree."""
+    def __init__(self, name_prefix=MONITOR_LOGGER):
         super().__init__()
-        self.records = []
+        self._prefix = name_prefix
+        # Bounded so a chatty code path cannot grow the capture without limit
+        self.messages = deque(maxlen=4096)
 
     def emit(self, record):
-        self.records.append(record)
+        # Skip other loggers before paying for % formatting
+        if not record.name.startswith(self._prefix):
+            return
+        # Format once here rather than on every get_messages() call
+        self.messages.append(record.getMessage())
 
     def get_messages(self, prefix=None):
         """Get all logged messages, optionally filtered by prefix."""
-        messages = [record.getMessage() for record in self.records]
         if prefix:
-            messages = [m for m in messages if prefix in m]
-        return messages
+            return [m for m in self.messages if prefix in m]
+        return list(self.messages)
 
     def clear(self):
         """Clear captured logs."""
-        self.records = []
+        self.messages.clear()
+
+
+def assert_all_present(messages, needles):
+    """Assert that every needle appears in at least one message."""
+    joined = "\n".join(messages)
+    missing = [needle for needle in needles if needle not in joined]
+    assert not missing, f"Missing log messages: {missing}"
 
 
 @pytest.fixture
 def log_capture():
-    """Create a log capture handler and attach it to the logger."""
-    # Get the monitoring logger specifically
-    monitor_logger = logging.getLogger("src.monitoring.monitor")
-
-    # Also get root logger to catch all
+    """Create a log capture handler for the monitor logger's records."""
+    monitor_logger = logging.getLogger(MONITOR_LOGGER)
     root_logger = logging.getLogger()
 
-    # Create and attach our capture handler
+    # Monitor records propagate to the root handler; only the monitor logger
+    # needs to let DEBUG through
     capture = LogCapture()
     capture.setLevel(logging.DEBUG)
-
-    # Add to both loggers to ensure we catch everything
-    monitor_logger.addHandler(capture)
     root_logger.addHandler(capture)
 
-    # Make sure logger level allows DEBUG
+    previous_level = monitor_logger.level
     monitor_logger.setLevel(logging.DEBUG)
-    root_logger.setLevel(logging.DEBUG)
 
     yield capture
 
     # Clean up
-    monitor_logger.removeHandler(capture)
+    monitor_logger.setLevel(previous_level)
     root_logger.removeHandler(capture)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def temp_db():
-    """Create a temporary test database."""
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
+    """Create the in-memory test database and its schema once per session.
+
+    DatabaseManager uses StaticPool for :memory:, so every session sees the
+    same database.
+    """
+    db = DatabaseManager(":memory:")
 
-    db = DatabaseManager(path)
     db.create_tables()
 
     yield db
 
-    # Cleanup
+    db.engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def workflow_with_phases(temp_db):
+    """Create the integration test workflow and its phases once per session."""
+    session = temp_db.get_session()
     try:
-        os.unlink(path)
-    except:
-        pass
+        if session.get(Workflow, "integration-test-workflow") is not None:
+            return "integration-test-workflow"
 
+        workflow = Workflow(
+            id="integration-test-workflow",
+            name="Integration Test Workflow",
+            phases_folder_path="/tmp/test",
+            status="active",
+        )
 
-@pytest.fixture
+        # Create phases
+        phase1 = Phase(
+            id="phase-1",
+            workflow_id="integration-test-workflow",
+            order=1,
+            name="Planning",
+            description="Planning phase",
+            done_definitions=["Create plan", "Review plan"],
+        )
+        phase2 = Phase(
+            id="phase-2",
+            workflow_id="integration-test-workflow",
+            order=2,
+            name="Implementation",
+            description="Implementation phase",
+            done_definitions=["Implement solution", "Test solution"],
+        )
+        session.add_all([workflow, phase1, phase2])
+        session.commit()
+    finally:
+        session.close()
+
+    return "integration-test-workflow"
+
+
+@pytest.fixture(autouse=True)
+def db_session(temp_db, workflow_with_phases):
+    """Run each test inside one transaction that is rolled back afterwards.
+
+    temp_db hands out sessions bound to this test's connection. They join the
+    outer transaction in rollback_only mode: commits only flush and close()
+    leaves the transaction alone, so rows written by one of the monitoring
+    loop's sessions survive another (nested) session closing, as they would
+    with separate connections. Yields a session for seeding and checking rows.
+    """
+    connection = temp_db.engine.connect()
+    transaction = connection.begin()
+
+    engine_sessions = temp_db.SessionLocal
+    temp_db.SessionLocal = sessionmaker(
+        bind=connection, autoflush=False, join_transaction_mode="rollback_only"
+    )
+    session = temp_db.get_session()
+
+    yield session
+
+    session.close()
+    temp_db.SessionLocal = engine_sessions
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="session")
 def mock_agent_manager():
     """Create a mock agent manager."""
     manager = Mock()
@@ -102,64 +192,41 @@ def mock_agent_manager():
         mock_agent.current_task_id = task.id
         return mock_agent
 
+    # No test inspects these calls, so a plain coroutine function is enough
+    async def get_project_context_mock():
+        return "Test context"
+
     manager.create_agent_for_task = AsyncMock(side_effect=create_agent_mock)
-    manager.get_project_context = AsyncMock(return_value="Test context")
+    manager.get_project_context = get_project_context_mock
 
     return manager
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_llm_provider():
     """Create a mock LLM provider."""
     return Mock()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_rag_system():
     """Create a mock RAG system."""
     return Mock()
 
 
-@pytest.fixture
-def mock_phase_manager(temp_db):
-    """Create a mock phase manager with a real workflow."""
-    manager = Mock()
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_agent_manager, mock_llm_provider, mock_rag_system):
+    """Clear call history on the session-scoped mocks before each test."""
+    for mock in (mock_agent_manager, mock_llm_provider, mock_rag_system):
+        mock.reset_mock()
 
-    # Create a real workflow in the database
-    session = temp_db.get_session()
-    try:
-        workflow = Workflow(
-            id="integration-test-workflow",
-            name="Integration Test Workflow",
-            phases_folder_path="/tmp/test",
-            status="active",
-        )
-        session.add(workflow)
 
-        # Create phases
-        phase1 = Phase(
-            id="phase-1",
-            workflow_id="integration-test-workflow",
-            order=1,
-            name="Planning",
-            description="Planning phase",
-            done_definitions=["Create plan", "Review plan"],
-        )
-        phase2 = Phase(
-            id="phase-2",
-            workflow_id="integration-test-workflow",
-            order=2,
-            name="Implementation",
-            description="Implementation phase",
-            done_definitions=["Implement solution", "Test solution"],
-        )
-        session.add(phase1)
-        session.add(phase2)
-        session.commit()
-    finally:
-        session.close()
+@pytest.fixture(scope="session")
+def mock_phase_manager(workflow_with_phases):
+    """Create a mock phase manager with a real workflow."""
+    manager = Mock()
 
-    manager.workflow_id = "integration-test-workflow"
+    manager.workflow_id = workflow_with_phases
 
     # Mock workflow config
     workflow_config = Mock()
@@ -169,9 +236,14 @@ def mock_phase_manager(temp_db):
     return manager
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def monitoring_loop(temp_db, mock_agent_manager, mock_llm_provider, mock_rag_system, mock_phase_manager):
-    """Create a monitoring loop for integration testing."""
+    """Create a monitoring loop for integration testing, shared by the module.
+
+    The stuck-state check keeps no state on the loop (cooldowns come from
+    DiagnosticRun rows) and opens its sessions through temp_db, which
+    db_session rebinds per test, so nothing needs resetting between tests.
+    """
     loop = MonitoringLoop(
         db_manager=temp_db,
         agent_manager=mock_agent_manager,
@@ -184,80 +256,71 @@ def monitoring_loop(temp_db, mock_agent_manager, mock_llm_provider, mock_rag_sys
     return loop
 
 
-class TestDiagnosticIntegration:
-    """Integration tests for diagnostic agent system."""
+def _task(status="done", completed_at=None):
+    """Task in phase 1 of the integration test workflow."""
+    return Task(
+        id="task-1",
+        raw_description="Test task",
+        enriched_description="Test task",
+        done_definition="Complete test",
+        status=status,
+        workflow_id="integration-test-workflow",
+        phase_id="phase-1",
+        completed_at=completed_at,
+    )
 
-    @pytest.mark.asyncio
-    async def test_diagnostic_not_triggered_no_tasks(self, monitoring_loop, log_capture):
-        """Test that diagnostic is not triggered when there are no tasks."""
-        log_capture.clear()
 
-        await monitoring_loop._check_workflow_stuck_state()
+def _seed_no_tasks():
+    """The workflow has no tasks."""
+    return []
 
-        # Check logs
-        messages = log_capture.get_messages("[DIAGNOSTIC MONITOR]")
 
-        # Should have status report
-        assert any("DIAGNOSTIC STATUS REPORT" in m for m in messages)
-        assert any("No tasks in workflow" in m for m in messages)
-        assert any("NOT TRIGGERING" in m for m in messages)
-
-        # Should show conditions
-        assert any("Has Tasks:            ❌" in m for m in messages)
-
-    @pytest.mark.asyncio
-    async def test_diagnostic_not_triggered_active_tasks(self, monitoring_loop, temp_db, log_capture):
-        """Test that diagnostic is not triggered when tasks are still active."""
-        # Create an active task
-        session = temp_db.get_session()
-        try:
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="in_progress",  # Active
-                workflow_id="integration-test-workflow",
-                phase_id="phase-1",
-            )
-            session.add(task)
-            session.commit()
-        finally:
-            session.close()
+def _seed_active_task():
+    """A task is still in progress."""
+    return [_task(status="in_progress")]
 
-        log_capture.clear()
-        await monitoring_loop._check_workflow_stuck_state()
 
-        # Check logs
-        messages = log_capture.get_messages("[DIAGNOSTIC MONITOR]")
+def _seed_recent_completion():
+    """The only task completed 30s ago, less than the 60s threshold."""
+    return [_task(completed_at=datetime.utcnow() - timedelta(seconds=30))]
+
+
+def _seed_recent_diagnostic():
+    """A diagnostic run was triggered 30s ago, inside the cooldown."""
+    return [
+        _task(completed_at=datetime.utcnow() - timedelta(minutes=5)),
+        DiagnosticRun(
+            id="diag-1",
+            workflow_id="integration-test-workflow",
+            triggered_at=datetime.utcnow() - timedelta(seconds=30),
+            total_tasks_at_trigger=1,
+            done_tasks_at_trigger=1,
+            failed_tasks_at_trigger=0,
+            time_since_last_task_seconds=300,
+            workflow_goal="Test goal",
+        ),
+    ]
+
+
+# (seed, expected log lines) for checks that must not trigger. Seeds build
+# fresh rows per run because each test's inserts are rolled back.
+NOT_TRIGGERED_CASES = [
+    pytest.param(_seed_no_tasks, ["No tasks in workflow", "Has Tasks:            ❌"], id="no_tasks"),
+    pytest.param(_seed_active_task, ["Tasks still active", "All Tasks Finished:   ❌"], id="active_tasks"),
+    pytest.param(_seed_recent_completion, ["Not stuck long enough", "Stuck Long Enough:    ❌"], id="too_recent"),
+    pytest.param(_seed_recent_diagnostic, ["Cooldown active", "Cooldown Passed:      ❌"], id="cooldown"),
+]
+
+
+@pytest.mark.xdist_group(name="diagnostic_integration")
+class TestDiagnosticIntegration:
+    """Integration tests for diagnostic agent system."""
 
-        assert any("DIAGNOSTIC STATUS REPORT" in m for m in messages)
-        assert any("Tasks still active" in m for m in messages)
-        assert any("NOT TRIGGERING" in m for m in messages)
-
-        # Should show active tasks condition failed
-        assert any("All Tasks Finished:   ❌" in m for m in messages)
-
-    @pytest.mark.asyncio
-    async def test_diagnostic_not_triggered_too_recent(self, monitoring_loop, temp_db, log_capture):
-        """Test that diagnostic is not triggered when task completed too recently."""
-        # Create a recently completed task
-        session = temp_db.get_session()
-        try:
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="integration-test-workflow",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(seconds=30),  # 30s ago, less than 60s threshold
-            )
-            session.add(task)
-            session.commit()
-        finally:
-            session.close()
+    @pytest.mark.parametrize("seed, expected", NOT_TRIGGERED_CASES)
+    async def test_diagnostic_not_triggered(self, monitoring_loop, db_session, log_capture, seed, expected):
+        """Test that diagnostic is not triggered when a condition fails."""
+        db_session.add_all(seed())
+        db_session.commit()
 
         log_capture.clear()
         await monitoring_loop._check_workflow_stuck_state()
@@ -265,33 +328,23 @@ class TestDiagnosticIntegration:
         # Check logs
         messages = log_capture.get_messages("[DIAGNOSTIC MONITOR]")
 
-        assert any("DIAGNOSTIC STATUS REPORT" in m for m in messages)
-        assert any("Not stuck long enough" in m for m in messages)
-        assert any("NOT TRIGGERING" in m for m in messages)
+        assert_all_present(messages, ["DIAGNOSTIC STATUS REPORT", "NOT TRIGGERING", *expected])
 
-        # Should show stuck time condition failed
-        assert any("Stuck Long Enough:    ❌" in m for m in messages)
-
-    @pytest.mark.asyncio
-    async def test_diagnostic_triggered_workflow_stuck(self, monitoring_loop, temp_db, log_capture):
+    async def test_diagnostic_triggered_workflow_stuck(self, monitoring_loop, db_session, log_capture):
         """Test that diagnostic agent is triggered when workflow is stuck."""
         # Create a task that completed long ago
-        session = temp_db.get_session()
-        try:
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="integration-test-workflow",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(minutes=5),  # 5 min ago
-            )
-            session.add(task)
-            session.commit()
-        finally:
-            session.close()
+        task = Task(
+            id="task-1",
+            raw_description="Test task",
+            enriched_description="Test task",
+            done_definition="Complete test",
+            status="done",
+            workflow_id="integration-test-workflow",
+            phase_id="phase-1",
+            completed_at=datetime.utcnow() - timedelta(minutes=5),  # 5 min ago
+        )
+        db_session.add(task)
+        db_session.commit()
 
         log_capture.clear()
         await monitoring_loop._check_workflow_stuck_state()
@@ -299,142 +352,77 @@ class TestDiagnosticIntegration:
         # Check logs
         messages = log_capture.get_messages("[DIAGNOSTIC MONITOR]")
 
-        # Should have triggered
-        assert any("WORKFLOW STUCK DETECTED" in m for m in messages)
-        assert any("TRIGGERING DIAGNOSTIC AGENT" in m for m in messages)
-
-        # All conditions should pass
-        assert any("Enabled:              ✅" in m for m in messages)
-        assert any("Workflow Exists:      ✅" in m for m in messages)
-        assert any("Has Tasks:            ✅" in m for m in messages)
-        assert any("All Tasks Finished:   ✅" in m for m in messages)
-        assert any("No Validated Result:  ✅" in m for m in messages)
-        assert any("Cooldown Passed:      ✅" in m for m in messages)
-        assert any("Stuck Long Enough:    ✅" in m for m in messages)
-
-        # Should have created diagnostic agent
-        assert any("Creating diagnostic agent" in m for m in messages)
-        assert any("Diagnostic agent created successfully" in m for m in messages)
+        assert_all_present(messages, [
+            # Should have triggered
+            "WORKFLOW STUCK DETECTED",
+            "TRIGGERING DIAGNOSTIC AGENT",
+            # All conditions should pass
+            *PASS_CONDITIONS,
+            # Should have created diagnostic agent
+            "Creating diagnostic agent",
+            "Diagnostic agent created successfully",
+        ])
 
         # Verify diagnostic run was created
-        session = temp_db.get_session()
-        try:
-            diagnostic_runs = session.query(DiagnosticRun).all()
-            assert len(diagnostic_runs) == 1
-
-            run = diagnostic_runs[0]
-            assert run.workflow_id == "integration-test-workflow"
-            assert run.total_tasks_at_trigger == 1
-            assert run.done_tasks_at_trigger == 1
-            assert run.status in ['created', 'running']
-        finally:
-            session.close()
-
-    @pytest.mark.asyncio
-    async def test_diagnostic_respects_cooldown(self, monitoring_loop, temp_db, log_capture):
-        """Test that diagnostic respects cooldown period."""
-        # Create a completed task
-        session = temp_db.get_session()
-        try:
-            task = Task(
-                id="task-1",
-                raw_description="Test task",
-                enriched_description="Test task",
-                done_definition="Complete test",
-                status="done",
-                workflow_id="integration-test-workflow",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(minutes=5),
-            )
-            session.add(task)
-
-            # Create a recent diagnostic run
-            diagnostic_run = DiagnosticRun(
-                id="diag-1",
-                workflow_id="integration-test-workflow",
-                triggered_at=datetime.utcnow() - timedelta(seconds=30),  # 30s ago
-                total_tasks_at_trigger=1,
-                done_tasks_at_trigger=1,
-                failed_tasks_at_trigger=0,
-                time_since_last_task_seconds=300,
-                workflow_goal="Test goal",
-            )
-            session.add(diagnostic_run)
-            session.commit()
-        finally:
-            session.close()
+        diagnostic_runs = db_session.query(DiagnosticRun).all()
+        assert len(diagnostic_runs) == 1
 
-        log_capture.clear()
-        await monitoring_loop._check_workflow_stuck_state()
+        run = diagnostic_runs[0]
+        assert run.workflow_id == "integration-test-workflow"
+        assert run.total_tasks_at_trigger == 1
+        assert run.done_tasks_at_trigger == 1
+        assert run.status in ['created', 'running']
 
-        # Check logs
-        messages = log_capture.get_messages("[DIAGNOSTIC MONITOR]")
+    async def test_full_diagnostic_flow_with_logging(self, monitoring_loop, db_session, log_capture):
+        """Test the complete diagnostic flow and verify all logs."""
+        # Setup: Create multiple completed tasks representing a stuck workflow
+        # Phase 1 tasks (completed)
+        task1 = Task(
+            id="task-1",
+            raw_description="Planning task",
+            enriched_description="Create project plan",
+            done_definition="Plan documented",
+            status="done",
+            workflow_id="integration-test-workflow",
+            phase_id="phase-1",
+            completed_at=datetime.utcnow() - timedelta(minutes=10),
+            completion_notes="Created plan.md with approach",
+        )
 
-        assert any("DIAGNOSTIC STATUS REPORT" in m for m in messages)
-        assert any("Cooldown active" in m for m in messages)
-        assert any("NOT TRIGGERING" in m for m in messages)
+        # Phase 2 tasks (completed)
+        task2 = Task(
+            id="task-2",
+            raw_description="Implementation task",
+            enriched_description="Implement solution",
+            done_definition="Code written",
+            status="done",
+            workflow_id="integration-test-workflow",
+            phase_id="phase-2",
+            completed_at=datetime.utcnow() - timedelta(minutes=5),
+            completion_notes="Implemented main.py",
+        )
 
-        # Should show cooldown condition failed
-        assert any("Cooldown Passed:      ❌" in m for m in messages)
+        # Create agents for these tasks
+        agent1 = Agent(
+            id="agent-1",
+            system_prompt="Planning agent",
+            status="terminated",
+            cli_type="claude",
+            current_task_id="task-1",
+            agent_type="phase",
+        )
 
-    @pytest.mark.asyncio
-    async def test_full_diagnostic_flow_with_logging(self, monitoring_loop, temp_db, log_capture):
-        """Test the complete diagnostic flow and verify all logs."""
-        # Setup: Create multiple completed tasks representing a stuck workflow
-        session = temp_db.get_session()
-        try:
-            # Phase 1 tasks (completed)
-            task1 = Task(
-                id="task-1",
-                raw_description="Planning task",
-                enriched_description="Create project plan",
-                done_definition="Plan documented",
-                status="done",
-                workflow_id="integration-test-workflow",
-                phase_id="phase-1",
-                completed_at=datetime.utcnow() - timedelta(minutes=10),
-                completion_notes="Created plan.md with approach",
-            )
-
-            # Phase 2 tasks (completed)
-            task2 = Task(
-                id="task-2",
-                raw_description="Implementation task",
-                enriched_description="Implement solution",
-                done_definition="Code written",
-                status="done",
-                workflow_id="integration-test-workflow",
-                phase_id="phase-2",
-                completed_at=datetime.utcnow() - timedelta(minutes=5),
-                completion_notes="Implemented main.py",
-            )
-
-            # Create agents for these tasks
-            agent1 = Agent(
-                id="agent-1",
-                system_prompt="Planning agent",
-                status="terminated",
-                cli_type="claude",
-                current_task_id="task-1",
-                agent_type="phase",
-            )
-
-            agent2 = Agent(
-                id="agent-2",
-                system_prompt="Implementation agent",
-                status="terminated",
-                cli_type="claude",
-                current_task_id="task-2",
-                agent_type="phase",
-            )
-
-            session.add(task1)
-            session.add(task2)
-            session.add(agent1)
-            session.add(agent2)
-            session.commit()
-        finally:
-            session.close()
+        agent2 = Agent(
+            id="agent-2",
+            system_prompt="Implementation agent",
+            status="terminated",
+            cli_type="claude",
+            current_task_id="task-2",
+            agent_type="phase",
+        )
+
+        db_session.add_all([task1, task2, agent1, agent2])
+        db_session.commit()
 
         log_capture.clear()
 
@@ -451,91 +439,58 @@ class TestDiagnosticIntegration:
             print(msg)
         print("="*80 + "\n")
 
-        # 1. Check initial detection
-        assert any("Starting workflow stuck state check" in m for m in messages), \
-            "Should log start of check"
-
-        # 2. Check condition evaluations
-        assert any("Workflow exists:" in m for m in messages), \
-            "Should log workflow existence"
-        assert any("Has tasks: 2 total" in m for m in messages), \
-            "Should log task count"
-        assert any("All tasks finished: 2 tasks" in m for m in messages), \
-            "Should log all tasks finished"
-        assert any("No validated result" in m for m in messages), \
-            "Should log no validated result"
-        assert any("Cooldown passed" in m for m in messages), \
-            "Should log cooldown status"
-        assert any("Stuck long enough" in m for m in messages), \
-            "Should log stuck time"
-
-        # 3. Check status report
-        assert any("DIAGNOSTIC STATUS REPORT" in m for m in messages), \
-            "Should have status report"
-        assert any("Enabled:              ✅" in m for m in messages), \
-            "Should show enabled"
-        assert any("Workflow Exists:      ✅" in m for m in messages), \
-            "Should show workflow exists"
-        assert any("Has Tasks:            ✅" in m for m in messages), \
-            "Should show has tasks"
-        assert any("All Tasks Finished:   ✅" in m for m in messages), \
-            "Should show all finished"
-        assert any("No Validated Result:  ✅" in m for m in messages), \
-            "Should show no result"
-        assert any("Cooldown Passed:      ✅" in m for m in messages), \
-            "Should show cooldown passed"
-        assert any("Stuck Long Enough:    ✅" in m for m in messages), \
-            "Should show stuck long enough"
-
-        # 4. Check trigger decision
-        assert any("TRIGGERING DIAGNOSTIC AGENT" in m for m in messages), \
-            "Should show triggering decision"
-
-        # 5. Check agent creation process
-        assert any("Creating diagnostic agent" in m for m in messages), \
-            "Should log agent creation start"
-        assert any("Gathering diagnostic context" in m for m in messages), \
-            "Should log context gathering"
-        assert any("Context gathered: 2 phases" in m for m in messages), \
-            "Should log context details"
-        assert any("Created diagnostic task:" in m for m in messages), \
-            "Should log task creation"
-        assert any("Created diagnostic run:" in m for m in messages), \
-            "Should log run creation"
-        assert any("Generating diagnostic prompt" in m for m in messages), \
-            "Should log prompt generation"
-        assert any("Spawning diagnostic agent" in m for m in messages), \
-            "Should log agent spawning"
-        assert any("Diagnostic agent created successfully" in m for m in messages), \
-            "Should log success"
+        assert_all_present(messages, [
+            # 1. Initial detection
+            "Starting workflow stuck state check",
+            # 2. Condition evaluations
+            "Workflow exists:",
+            "Has tasks: 2 total",
+            "All tasks finished: 2 tasks",
+            "No validated result",
+            "Cooldown passed",
+            "Stuck long enough",
+            # 3. Status report
+            "DIAGNOSTIC STATUS REPORT",
+            *PASS_CONDITIONS,
+            # 4. Trigger decision
+            "TRIGGERING DIAGNOSTIC AGENT",
+            # 5. Agent creation process
+            "Creating diagnostic agent",
+            "Gathering diagnostic context",
+            "Context gathered: 2 phases",
+            "Created diagnostic task:",
+            "Created diagnostic run:",
+            "Generating diagnostic prompt",
+            "Spawning diagnostic agent",
+            "Diagnostic agent created successfully",
+        ])
+
+        # Each monitor record is captured once, not once per handler
+        assert len(log_capture.get_messages("Starting workflow stuck state check")) == 1
 
         # 6. Verify database state
-        session = temp_db.get_session()
-        try:
-            # Should have created diagnostic run
-            diagnostic_runs = session.query(DiagnosticRun).all()
-            assert len(diagnostic_runs) == 1, "Should create one diagnostic run"
-
-            run = diagnostic_runs[0]
-            assert run.workflow_id == "integration-test-workflow"
-            assert run.total_tasks_at_trigger == 2
-            assert run.done_tasks_at_trigger == 2
-            assert run.failed_tasks_at_trigger == 0
-            assert run.status in ['created', 'running']
-
-            # Should have created diagnostic task
-            diagnostic_tasks = session.query(Task).filter(
-                Task.raw_description.like("DIAGNOSTIC%")
-            ).all()
-            assert len(diagnostic_tasks) == 1, "Should create one diagnostic task"
-
-            diagnostic_task = diagnostic_tasks[0]
-            assert diagnostic_task.workflow_id == "integration-test-workflow"
-            assert diagnostic_task.priority == "high"
-            assert diagnostic_task.phase_id is None  # Phase-agnostic
-
-        finally:
-            session.close()
+        # Should have created diagnostic run
+        diagnostic_runs = db_session.query(DiagnosticRun).all()
+        assert len(diagnostic_runs) == 1, "Should create one diagnostic run"
+
+        run = diagnostic_runs[0]
+        assert run.workflow_id == "integration-test-workflow"
+        assert run.total_tasks_at_trigger == 2
+        assert run.done_tasks_at_trigger == 2
+        assert run.failed_tasks_at_trigger == 0
+        assert run.status in ['created', 'running']
+
+        # Should have created diagnostic task
+        diagnostic_tasks = db_session.query(Task).filter(
+            Task.raw_description.like("DIAGNOSTIC%")
+        ).all()
+        assert len(diagnostic_tasks) == 1, "Should create one diagnostic task"
+
+        diagnostic_task = diagnostic_tasks[0]
+        assert diagnostic_task.workflow_id == "integration-test-workflow"
+        assert diagnostic_task.priority == "high"
+        assert diagnostic_task.phase_id is None  # Phase-agnostic
+
 
 
 if __name__ == "__main__":
@@ -7,12 +7,9 @@ and that create_task properly validates ticket_id when tracking is enabled.
 
 import pytest
 import os
-import sys
 from datetime import datetime
 from fastapi.testclient import TestClient
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.mcp.server import app
 from src.core.database import DatabaseManager, get_db, Workflow, Agent, BoardConfig
 
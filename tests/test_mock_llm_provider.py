@@ -14,7 +14,10 @@ def test_mock_llm_provider_initialization():
     assert provider.provider_name == "test-provider"
     assert provider.call_count == 0
     assert provider.last_request is None
-    assert provider.responses == []
+    assert provider.responses is None  # History is opt-in
+
+    recording = MockLLMProvider(record_history=True)
+    assert recording.responses == []
 
 
 def test_mock_llm_completion(mock_llm_provider):
@@ -101,6 +104,20 @@ def test_mock_llm_embedding_deterministic(mock_llm_provider):
     assert embedding1 == embedding2
 
 
+def test_mock_llm_embedding_cache(mock_llm_provider):
+    """Test that cached embeddings are returned as independent copies."""
+    text = "Cached test text"
+
+    embedding1 = mock_llm_provider.generate_embedding(text)["data"][0]["embedding"]
+    embedding1[0] = 42.0  # Mutating one response must not leak into the cache
+    embedding2 = mock_llm_provider.generate_embedding(text)["data"][0]["embedding"]
+    assert embedding2[0] != 42.0
+
+    mock_llm_provider.reset_cache()
+    embedding3 = mock_llm_provider.generate_embedding(text)["data"][0]["embedding"]
+    assert embedding3 == embedding2
+
+
 def test_mock_llm_call_count(mock_llm_provider):
     """Test that call count increments correctly."""
     assert mock_llm_provider.call_count == 0
@@ -115,37 +132,46 @@ def test_mock_llm_call_count(mock_llm_provider):
     assert mock_llm_provider.call_count == 3
 
 
-def test_mock_llm_response_history(mock_llm_provider):
-    """Test that response history is tracked."""
-    assert len(mock_llm_provider.responses) == 0
+def test_mock_llm_response_history():
+    """Test that response history is tracked when enabled."""
+    provider = MockLLMProvider(record_history=True)
+    assert len(provider.responses) == 0
 
-    mock_llm_provider.generate_completion("Test 1")
-    assert len(mock_llm_provider.responses) == 1
+    provider.generate_completion("Test 1")
+    assert len(provider.responses) == 1
 
-    mock_llm_provider.generate_chat_completion([{"role": "user", "content": "Test 2"}])
-    assert len(mock_llm_provider.responses) == 2
+    provider.generate_chat_completion([{"role": "user", "content": "Test 2"}])
+    assert len(provider.responses) == 2
+
+    provider.generate_embedding("Test 3")
+    assert len(provider.responses) == 3
 
-    mock_llm_provider.generate_embedding("Test 3")
-    assert len(mock_llm_provider.responses) == 3
+
+def test_mock_llm_response_history_disabled(mock_llm_provider):
+    """Test that responses are not retained by default."""
+    mock_llm_provider.generate_completion("Test")
+    assert mock_llm_provider.responses is None
 
 
-def test_mock_llm_reset(mock_llm_provider):
+def test_mock_llm_reset():
     """Test that reset clears provider state."""
+    provider = MockLLMProvider(record_history=True)
+
     # Make some calls
-    mock_llm_provider.generate_completion("Test")
-    mock_llm_provider.generate_embedding("Test")
+    provider.generate_completion("Test")
+    provider.generate_embedding("Test")
 
-    assert mock_llm_provider.call_count == 2
-    assert len(mock_llm_provider.responses) == 2
-    assert mock_llm_provider.last_request is not None
+    assert provider.call_count == 2
+    assert len(provider.responses) == 2
+    assert provider.last_request is not None
 
     # Reset
-    mock_llm_provider.reset()
+    provider.reset()
 
     # State should be cleared
-    assert mock_llm_provider.call_count == 0
-    assert len(mock_llm_provider.responses) == 0
-    assert mock_llm_provider.last_request is None
+    assert provider.call_count == 0
+    assert len(provider.responses) == 0
+    assert provider.last_request is None
 
 
 def test_mock_llm_usage_tracking(mock_llm_provider):
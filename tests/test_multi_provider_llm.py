@@ -4,11 +4,6 @@ import pytest
 import asyncio
 import os
 from unittest.mock import Mock, patch, AsyncMock, MagicMock
-from pathlib import Path
-import sys
-
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.llm_config import (
     SimpleConfig,
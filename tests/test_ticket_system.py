@@ -2,13 +2,9 @@
 
 import pytest
 import os
-import sys
 from datetime import datetime
 import json
 
-# Add parent directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.core.database import (
     DatabaseManager,
     Ticket,
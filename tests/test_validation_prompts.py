@@ -4,12 +4,6 @@ import pytest
 import asyncio
 from unittest.mock import Mock, patch, MagicMock, AsyncMock, call, ANY
 from datetime import datetime
-from pathlib import Path
-import sys
-import os
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.monitoring.prompt_loader import PromptLoader
 from src.core.database import Task